@@ -53,10 +53,18 @@ from uuid import uuid4
 import hashlib
 import json
 import re
+import atexit
 import logging
+import logging.handlers
+import queue
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Configure logging: handlers hand records to a queue and a listener
+# thread does the actual stream writes, so message handlers never block on I/O
+log_queue = queue.Queue(-1)
+log_listener = logging.handlers.QueueListener(log_queue, logging.StreamHandler())
+logging.basicConfig(level=logging.INFO, handlers=[logging.handlers.QueueHandler(log_queue)])
+log_listener.start()
+atexit.register(log_listener.stop)
 logger = logging.getLogger(__name__)
 
 # Initialize agent
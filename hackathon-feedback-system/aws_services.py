@@ -11,7 +11,9 @@ import boto3
 import json
 import asyncio
 from datetime import datetime
+from functools import lru_cache
 from typing import Dict, List, Optional
+from botocore.config import Config
 from botocore.exceptions import ClientError, NoCredentialsError
 import logging
 
@@ -28,14 +30,38 @@ from config import (
 
 logger = logging.getLogger(__name__)
 
+# Shared client settings: a larger keep-alive connection pool so concurrent
+# requests reuse TLS connections, adaptive retries to back off on throttling,
+# and short connect timeouts so an unreachable endpoint fails fast
+BOTO_CONFIG = Config(
+    max_pool_connections=50,
+    tcp_keepalive=True,
+    connect_timeout=3,
+    read_timeout=30,
+    retries={'max_attempts': 3, 'mode': 'adaptive'}
+)
+
+# Poll table status every 2s instead of the waiter's default 20s, capped at 300s
+TABLE_WAITER_CONFIG = {'Delay': 2, 'MaxAttempts': 150}
+
 # Initialize AWS clients
+@lru_cache(maxsize=1)
+def get_boto_session():
+    """Shared boto3 session, so credentials are resolved once per process"""
+    return boto3.Session(**get_aws_config())
+
+@lru_cache(maxsize=None)
+def create_client(service_name: str):
+    """Create a client on the shared session; cached, as clients are thread-safe"""
+    kwargs = {}
+    if service_name == 'dynamodb' and DYNAMODB_ENDPOINT:  # For local development
+        kwargs['endpoint_url'] = DYNAMODB_ENDPOINT
+    return get_boto_session().client(service_name, config=BOTO_CONFIG, **kwargs)
+
 def get_dynamodb_client():
     """Get DynamoDB client with proper configuration"""
     try:
-        config = get_aws_config()
-        if DYNAMODB_ENDPOINT:  # For local development
-            config['endpoint_url'] = DYNAMODB_ENDPOINT
-        return boto3.client('dynamodb', **config)
+        return create_client('dynamodb')
     except Exception as e:
         logger.error(f"Failed to create DynamoDB client: {e}")
         return None
@@ -43,8 +69,7 @@ def get_dynamodb_client():
 def get_s3_client():
     """Get S3 client with proper configuration"""
     try:
-        config = get_aws_config()
-        return boto3.client('s3', **config)
+        return create_client('s3')
     except Exception as e:
         logger.error(f"Failed to create S3 client: {e}")
         return None
@@ -52,14 +77,20 @@ def get_s3_client():
 def get_cloudwatch_client():
     """Get CloudWatch client with proper configuration"""
     try:
-        config = get_aws_config()
-        return boto3.client('cloudwatch', **config)
+        return create_client('cloudwatch')
     except Exception as e:
         logger.error(f"Failed to create CloudWatch client: {e}")
         return None
 
+# Set once the table is known to exist, so later writes skip the describe_table probe
+table_ready = False
+
 async def create_dynamodb_table():
     """Create DynamoDB table if it doesn't exist"""
+    global table_ready
+    if table_ready:
+        return True
+    
     try:
         dynamodb = get_dynamodb_client()
         if not dynamodb:
@@ -69,6 +100,7 @@ async def create_dynamodb_table():
         try:
             response = dynamodb.describe_table(TableName=DYNAMODB_TABLE_NAME)
             logger.info(f"Table {DYNAMODB_TABLE_NAME} already exists")
+            table_ready = True
             return True
         except ClientError as e:
             if e.response['Error']['Code'] != 'ResourceNotFoundException':
@@ -124,14 +156,33 @@ async def create_dynamodb_table():
         
         # Wait for table to be active
         waiter = dynamodb.get_waiter('table_exists')
-        waiter.wait(TableName=DYNAMODB_TABLE_NAME)
+        waiter.wait(TableName=DYNAMODB_TABLE_NAME, WaiterConfig=TABLE_WAITER_CONFIG)
         
+        table_ready = True
         return True
         
     except Exception as e:
         logger.error(f"Failed to create DynamoDB table: {e}")
         return False
 
+def build_dynamodb_item(feedback_data: Dict) -> Dict:
+    """Convert feedback data to DynamoDB attribute-value format"""
+    item = {
+        'feedback_id': {'S': feedback_data['feedback_id']},
+        'user_hash': {'S': feedback_data['user_hash']},
+        'hackathon_id': {'S': feedback_data['hackathon_id']},
+        'feedback_text': {'S': feedback_data['feedback_text']},
+        'timestamp': {'S': feedback_data['timestamp']},
+        'analysis': {'S': json.dumps(feedback_data.get('analysis', {}))},
+        'metadata': {'S': json.dumps(feedback_data.get('metadata', {}))}
+    }
+    
+    # Add email if provided
+    if feedback_data.get('user_email'):
+        item['user_email'] = {'S': feedback_data['user_email']}
+    
+    return item
+
 async def store_feedback_dynamodb(feedback_data: Dict) -> bool:
     """Store feedback data in DynamoDB"""
     try:
@@ -142,25 +193,10 @@ async def store_feedback_dynamodb(feedback_data: Dict) -> bool:
         # Ensure table exists
         await create_dynamodb_table()
         
-        # Convert data to DynamoDB format
-        item = {
-            'feedback_id': {'S': feedback_data['feedback_id']},
-            'user_hash': {'S': feedback_data['user_hash']},
-            'hackathon_id': {'S': feedback_data['hackathon_id']},
-            'feedback_text': {'S': feedback_data['feedback_text']},
-            'timestamp': {'S': feedback_data['timestamp']},
-            'analysis': {'S': json.dumps(feedback_data.get('analysis', {}))},
-            'metadata': {'S': json.dumps(feedback_data.get('metadata', {}))}
-        }
-        
-        # Add email if provided
-        if feedback_data.get('user_email'):
-            item['user_email'] = {'S': feedback_data['user_email']}
-        
         # Store in DynamoDB
         response = dynamodb.put_item(
             TableName=DYNAMODB_TABLE_NAME,
-            Item=item
+            Item=build_dynamodb_item(feedback_data)
         )
         
         logger.info(f"Stored feedback {feedback_data['feedback_id']} in DynamoDB")
@@ -170,6 +206,45 @@ async def store_feedback_dynamodb(feedback_data: Dict) -> bool:
         logger.error(f"Failed to store feedback in DynamoDB: {e}")
         raise
 
+# BatchWriteItem accepts at most 25 requests per call
+DYNAMODB_BATCH_SIZE = 25
+BATCH_WRITE_ATTEMPTS = 5
+
+async def store_feedback_batch_dynamodb(feedback_list: List[Dict]) -> bool:
+    """Store several feedback entries with BatchWriteItem (one round trip per 25 items)"""
+    try:
+        dynamodb = get_dynamodb_client()
+        if not dynamodb:
+            raise Exception("DynamoDB client not available")
+        
+        # Ensure table exists
+        await create_dynamodb_table()
+        
+        requests = [
+            {'PutRequest': {'Item': build_dynamodb_item(feedback_data)}}
+            for feedback_data in feedback_list
+        ]
+        
+        for start in range(0, len(requests), DYNAMODB_BATCH_SIZE):
+            pending = {DYNAMODB_TABLE_NAME: requests[start:start + DYNAMODB_BATCH_SIZE]}
+            
+            # Retry throttled items with exponential backoff
+            for attempt in range(BATCH_WRITE_ATTEMPTS):
+                response = dynamodb.batch_write_item(RequestItems=pending)
+                pending = response.get('UnprocessedItems')
+                if not pending:
+                    break
+                await asyncio.sleep(0.05 * 2 ** attempt)
+            else:
+                raise Exception(f"{len(pending[DYNAMODB_TABLE_NAME])} items left unprocessed")
+        
+        logger.info(f"Stored {len(requests)} feedback entries in DynamoDB")
+        return True
+        
+    except Exception as e:
+        logger.error(f"Failed to batch store feedback in DynamoDB: {e}")
+        raise
+
 async def get_feedback_from_dynamodb(hackathon_id: str, limit: int = 100) -> List[Dict]:
     """Retrieve feedback from DynamoDB for a specific hackathon"""
     try:
@@ -213,38 +288,47 @@ async def get_feedback_from_dynamodb(hackathon_id: str, limit: int = 100) -> Lis
         logger.error(f"Failed to retrieve feedback from DynamoDB: {e}")
         return []
 
+# Set once the backup bucket is known to exist, so later backups skip head_bucket
+bucket_ready = False
+
 async def backup_to_s3(feedback_data: Dict) -> bool:
     """Backup feedback data to S3"""
+    global bucket_ready
     try:
         s3 = get_s3_client()
         if not s3:
             logger.warning("S3 client not available, skipping backup")
             return False
         
-        # Create S3 bucket if it doesn't exist
-        try:
-            s3.head_bucket(Bucket=S3_BUCKET_NAME)
-        except ClientError as e:
-            if e.response['Error']['Code'] == '404':
-                # Bucket doesn't exist, create it
-                if AWS_REGION == 'us-east-1':
-                    s3.create_bucket(Bucket=S3_BUCKET_NAME)
-                else:
-                    s3.create_bucket(
-                        Bucket=S3_BUCKET_NAME,
-                        CreateBucketConfiguration={'LocationConstraint': AWS_REGION}
-                    )
-                logger.info(f"Created S3 bucket {S3_BUCKET_NAME}")
+        # Create S3 bucket if it doesn't exist (checked once per process)
+        # Only a successful head or create marks it ready; other errors
+        # (403, throttling) leave the check to be retried on the next backup
+        if not bucket_ready:
+            try:
+                s3.head_bucket(Bucket=S3_BUCKET_NAME)
+                bucket_ready = True
+            except ClientError as e:
+                if e.response['Error']['Code'] == '404':
+                    # Bucket doesn't exist, create it
+                    if AWS_REGION == 'us-east-1':
+                        s3.create_bucket(Bucket=S3_BUCKET_NAME)
+                    else:
+                        s3.create_bucket(
+                            Bucket=S3_BUCKET_NAME,
+                            CreateBucketConfiguration={'LocationConstraint': AWS_REGION}
+                        )
+                    logger.info(f"Created S3 bucket {S3_BUCKET_NAME}")
+                    bucket_ready = True
         
         # Generate S3 key
         timestamp = datetime.now()
         s3_key = f"{S3_BACKUP_PREFIX}{timestamp.strftime('%Y/%m/%d')}/{feedback_data['feedback_id']}.json"
         
-        # Upload to S3
+        # Upload to S3 as compact UTF-8 bytes (backups are machine-read)
         s3.put_object(
             Bucket=S3_BUCKET_NAME,
             Key=s3_key,
-            Body=json.dumps(feedback_data, indent=2, default=str),
+            Body=json.dumps(feedback_data, separators=(',', ':'), default=str).encode('utf-8'),
             ContentType='application/json'
         )
         
@@ -360,13 +444,25 @@ async def setup_aws_resources(hackathon_id: str) -> Dict[str, bool]:
     
     return results
 
+# One event loop per Lambda container, reused by warm invocations instead of
+# creating (and leaking) a new loop on every call
+handler_loop = None
+
+def run_in_handler_loop(coro):
+    """Run a coroutine to completion on the container's persistent loop"""
+    global handler_loop
+    if handler_loop is None or handler_loop.is_closed():
+        handler_loop = asyncio.new_event_loop()
+    return handler_loop.run_until_complete(coro)
+
 # Lambda function handler (for serverless deployment)
 def lambda_handler(event, context):
     """AWS Lambda handler for processing feedback"""
     try:
         # Parse the event
         if 'body' in event:
-            body = json.loads(event['body'])
+            raw_body = event['body']
+            body = json.loads(raw_body) if raw_body else {}
         else:
             body = event
         
@@ -378,14 +474,11 @@ def lambda_handler(event, context):
             }
         
         # Store feedback
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        success = loop.run_until_complete(store_feedback_dynamodb(feedback_data))
+        success = run_in_handler_loop(store_feedback_dynamodb(feedback_data))
         
         if success:
             # Send metrics
-            loop.run_until_complete(send_cloudwatch_metrics(
+            run_in_handler_loop(send_cloudwatch_metrics(
                 "FeedbackSubmitted", 
                 1, 
                 {"HackathonId": feedback_data.get("hackathon_id", "unknown")}
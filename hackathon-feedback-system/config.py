@@ -38,11 +38,14 @@ GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 GEMINI_MODEL = "gemini-2.0-flash-exp"  # or "gemini-1.5-pro" for stable version
 GEMINI_TEMPERATURE = 0.7
 GEMINI_MAX_TOKENS = 1000
+GEMINI_OUTPUT_TOKEN_LIMIT = 8192  # Model cap on output tokens per request
 
 # Feedback Collection Settings
 MIN_FEEDBACK_LENGTH = 20  # Minimum characters for valid feedback
 MAX_FEEDBACK_LENGTH = 1000  # Maximum characters
 FEEDBACK_TIMEOUT = 30  # Seconds to wait for AI processing
+AI_BATCH_SIZE = 16  # Max feedback entries analyzed in one Gemini request
+AI_BATCH_WINDOW = 0.02  # Seconds to wait for more feedback before sending a batch
 
 # Rate Limiting Settings
 MAX_REQUESTS_PER_USER = 3  # Allow multiple feedback submissions
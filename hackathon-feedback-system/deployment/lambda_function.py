@@ -4,8 +4,10 @@ AWS Lambda function for serverless hackathon feedback processing
 This function handles feedback storage and processing in a serverless environment
 """
 
+import base64
 import json
 import boto3
+from botocore.config import Config
 import logging
 from datetime import datetime
 from typing import Dict, Any
@@ -15,10 +17,17 @@ import os
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-# AWS clients
-dynamodb = boto3.client('dynamodb')
-s3 = boto3.client('s3')
-cloudwatch = boto3.client('cloudwatch')
+# AWS clients, created once per container and reused across invocations.
+# Adaptive retries back off on throttling; short timeouts keep a stalled
+# call from eating the function's time budget
+CLIENT_CONFIG = Config(
+    connect_timeout=3,
+    read_timeout=10,
+    retries={'max_attempts': 3, 'mode': 'adaptive'}
+)
+dynamodb = boto3.client('dynamodb', config=CLIENT_CONFIG)
+s3 = boto3.client('s3', config=CLIENT_CONFIG)
+cloudwatch = boto3.client('cloudwatch', config=CLIENT_CONFIG)
 
 # Environment variables
 DYNAMODB_TABLE = os.environ.get('DYNAMODB_TABLE_NAME', 'hackathon-feedback')
@@ -40,8 +49,14 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         
         # Parse the event
         if 'body' in event:
-            # API Gateway event
-            body = json.loads(event['body']) if isinstance(event['body'], str) else event['body']
+            # API Gateway event (body is None on GET/OPTIONS, base64 for binary payloads)
+            raw_body = event['body']
+            if raw_body and event.get('isBase64Encoded'):
+                raw_body = base64.b64decode(raw_body)
+            if isinstance(raw_body, (str, bytes)):
+                body = json.loads(raw_body) if raw_body else {}
+            else:
+                body = raw_body or {}
         else:
             # Direct invocation
             body = event
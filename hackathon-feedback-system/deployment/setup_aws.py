@@ -5,12 +5,56 @@ Automated setup of AWS resources for beginners
 """
 
 import boto3
+import io
 import json
 import time
 import sys
 import os
-from botocore.exceptions import ClientError, NoCredentialsError
-from typing import Dict, Any
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError, ClientError, NoCredentialsError
+from typing import Dict, Any, Tuple
+
+# Shared client settings: enough pooled keep-alive connections for the
+# concurrent setup steps, and adaptive retries for throttled control-plane calls
+CLIENT_CONFIG = Config(
+    max_pool_connections=32,
+    tcp_keepalive=True,
+    connect_timeout=3,
+    read_timeout=30,
+    retries={'max_attempts': 5, 'mode': 'adaptive'}
+)
+
+# Lambda runtime tunables, read once at import (python3.12 has the fastest
+# cold starts and supports SnapStart)
+LAMBDA_RUNTIME = os.getenv('LAMBDA_RUNTIME', 'python3.12')
+LAMBDA_ARCHITECTURE = os.getenv('LAMBDA_ARCHITECTURE', 'x86_64')
+PROVISIONED_CONCURRENCY = int(os.getenv('PROVISIONED_CONCURRENCY', '0'))
+
+# Lambda create_function retries while a new IAM role propagates
+ROLE_PROPAGATION_ATTEMPTS = 15
+ROLE_PROPAGATION_DELAY = 2  # Seconds
+
+# Resource waiters poll every 2s (default is 15-20s) with the same 300s cap
+WAITER_CONFIG = {'Delay': 2, 'MaxAttempts': 150}
+
+# Trust policy for the Lambda role; static, so serialized once at import
+LAMBDA_TRUST_POLICY = json.dumps({
+    "Version": "2012-10-17",
+    "Statement": [
+        {
+            "Effect": "Allow",
+            "Principal": {
+                "Service": "lambda.amazonaws.com"
+            },
+            "Action": "sts:AssumeRole"
+        }
+    ]
+})
+
+# Handler source lives next to this script; package it from disk as-is
+HANDLER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lambda_function.py')
 
 class AWSSetup:
     def __init__(self, region: str = "us-east-1", project_name: str = "hackathon-feedback"):
@@ -18,14 +62,16 @@ class AWSSetup:
         self.project_name = project_name
         self.environment = os.getenv("ENVIRONMENT", "dev")
         
-        # Initialize AWS clients
+        # Initialize AWS clients from one session so they share credential
+        # resolution and the loaded service models
         try:
-            self.dynamodb = boto3.client('dynamodb', region_name=region)
-            self.s3 = boto3.client('s3', region_name=region)
-            self.lambda_client = boto3.client('lambda', region_name=region)
-            self.iam = boto3.client('iam', region_name=region)
-            self.cloudwatch = boto3.client('cloudwatch', region_name=region)
-            self.apigateway = boto3.client('apigateway', region_name=region)
+            self.session = boto3.Session(region_name=region)
+            self.dynamodb = self.session.client('dynamodb', config=CLIENT_CONFIG)
+            self.s3 = self.session.client('s3', config=CLIENT_CONFIG)
+            self.lambda_client = self.session.client('lambda', config=CLIENT_CONFIG)
+            self.iam = self.session.client('iam', config=CLIENT_CONFIG)
+            self.cloudwatch = self.session.client('cloudwatch', config=CLIENT_CONFIG)
+            self.apigateway = self.session.client('apigateway', config=CLIENT_CONFIG)
             
             print(f"✅ AWS clients initialized for region: {region}")
         except NoCredentialsError:
@@ -110,12 +156,12 @@ class AWSSetup:
             # Wait for table to be active
             print("⏳ Waiting for table to be active...")
             waiter = self.dynamodb.get_waiter('table_exists')
-            waiter.wait(TableName=table_name)
+            waiter.wait(TableName=table_name, WaiterConfig=WAITER_CONFIG)
             
             print(f"✅ DynamoDB table '{table_name}' created successfully")
             return True
             
-        except Exception as e:
+        except (ClientError, BotoCoreError) as e:
             print(f"❌ Failed to create DynamoDB table: {e}")
             return False
     
@@ -144,30 +190,35 @@ class AWSSetup:
                     CreateBucketConfiguration={'LocationConstraint': self.region}
                 )
             
-            # Enable versioning
-            self.s3.put_bucket_versioning(
-                Bucket=bucket_name,
-                VersioningConfiguration={'Status': 'Enabled'}
-            )
-            
-            # Enable encryption
-            self.s3.put_bucket_encryption(
-                Bucket=bucket_name,
-                ServerSideEncryptionConfiguration={
-                    'Rules': [
-                        {
-                            'ApplyServerSideEncryptionByDefault': {
-                                'SSEAlgorithm': 'AES256'
+            # Enable versioning and encryption; the two settings are
+            # independent, so apply them concurrently
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                versioning = executor.submit(
+                    self.s3.put_bucket_versioning,
+                    Bucket=bucket_name,
+                    VersioningConfiguration={'Status': 'Enabled'}
+                )
+                encryption = executor.submit(
+                    self.s3.put_bucket_encryption,
+                    Bucket=bucket_name,
+                    ServerSideEncryptionConfiguration={
+                        'Rules': [
+                            {
+                                'ApplyServerSideEncryptionByDefault': {
+                                    'SSEAlgorithm': 'AES256'
+                                }
                             }
-                        }
-                    ]
-                }
-            )
+                        ]
+                    }
+                )
+            # Re-raise any failure from either call
+            versioning.result()
+            encryption.result()
             
             print(f"✅ S3 bucket '{bucket_name}' created successfully")
             return True
             
-        except Exception as e:
+        except (ClientError, BotoCoreError) as e:
             print(f"❌ Failed to create S3 bucket: {e}")
             return False
     
@@ -187,24 +238,10 @@ class AWSSetup:
             
             print(f"🔄 Creating IAM role: {role_name}")
             
-            # Trust policy for Lambda
-            trust_policy = {
-                "Version": "2012-10-17",
-                "Statement": [
-                    {
-                        "Effect": "Allow",
-                        "Principal": {
-                            "Service": "lambda.amazonaws.com"
-                        },
-                        "Action": "sts:AssumeRole"
-                    }
-                ]
-            }
-            
             # Create role
             response = self.iam.create_role(
                 RoleName=role_name,
-                AssumeRolePolicyDocument=json.dumps(trust_policy),
+                AssumeRolePolicyDocument=LAMBDA_TRUST_POLICY,
                 Description=f"IAM role for {self.project_name} Lambda function",
                 Tags=[
                     {
@@ -220,16 +257,20 @@ class AWSSetup:
             
             role_arn = response['Role']['Arn']
             
-            # Attach basic Lambda execution policy
-            self.iam.attach_role_policy(
-                RoleName=role_name,
-                PolicyArn='arn:aws:iam::aws:policy/service-role/AWSLambdaBasicExecutionRole'
-            )
-            
-            # Create and attach custom policy
+            # Single inline policy: CloudWatch Logs (what AWSLambdaBasicExecutionRole
+            # grants) plus the DynamoDB/S3/metrics access the handler uses
             policy_document = {
                 "Version": "2012-10-17",
                 "Statement": [
+                    {
+                        "Effect": "Allow",
+                        "Action": [
+                            "logs:CreateLogGroup",
+                            "logs:CreateLogStream",
+                            "logs:PutLogEvents"
+                        ],
+                        "Resource": "arn:aws:logs:*:*:*"
+                    },
                     {
                         "Effect": "Allow",
                         "Action": [
@@ -274,12 +315,10 @@ class AWSSetup:
             
             print(f"✅ IAM role '{role_name}' created successfully")
             
-            # Wait a bit for role to propagate
-            time.sleep(10)
-            
+            # Propagation is handled by create_lambda_function's retry
             return role_arn
             
-        except Exception as e:
+        except (ClientError, BotoCoreError) as e:
             print(f"❌ Failed to create IAM role: {e}")
             return ""
     
@@ -300,29 +339,20 @@ class AWSSetup:
             print(f"🔄 Creating Lambda function: {function_name}")
             
             # Create deployment package
-            import zipfile
-            import io
-            
             zip_buffer = io.BytesIO()
             
-            with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-                # Add lambda function
-                zip_file.write('lambda_function.py', 'lambda_function.py')
-                
-                # Add dependencies (you might need to adjust paths)
-                for file_name in ['../aws_services.py', '../functions.py', '../config.py']:
-                    if os.path.exists(file_name):
-                        zip_file.write(file_name, os.path.basename(file_name))
-            
-            zip_buffer.seek(0)
+            with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED, compresslevel=6) as zip_file:
+                # The handler is self-contained (stdlib + boto3 from the runtime),
+                # so nothing else is shipped or imported at cold start
+                zip_file.write(HANDLER_PATH, arcname='lambda_function.py')
             
-            # Create function
-            response = self.lambda_client.create_function(
+            function_args = dict(
                 FunctionName=function_name,
-                Runtime='python3.11',
+                Runtime=LAMBDA_RUNTIME,
+                Architectures=[LAMBDA_ARCHITECTURE],
                 Role=role_arn,
                 Handler='lambda_function.lambda_handler',
-                Code={'ZipFile': zip_buffer.read()},
+                Code={'ZipFile': zip_buffer.getvalue()},
                 Description=f'Hackathon feedback processor for {self.project_name}',
                 Timeout=30,
                 MemorySize=256,
@@ -334,16 +364,55 @@ class AWSSetup:
                         'ENVIRONMENT': self.environment
                     }
                 },
+                # SnapStart and provisioned concurrency can't share a version
+                SnapStart={'ApplyOn': 'None' if PROVISIONED_CONCURRENCY else 'PublishedVersions'},
                 Tags={
                     'Project': self.project_name,
                     'Environment': self.environment
                 }
             )
             
+            # A freshly created role takes a few seconds before Lambda can
+            # assume it; poll with short retries instead of a fixed sleep
+            for attempt in range(ROLE_PROPAGATION_ATTEMPTS):
+                try:
+                    response = self.lambda_client.create_function(**function_args)
+                    break
+                except ClientError as e:
+                    # Only the not-yet-assumable role is retried; other
+                    # invalid parameters surface immediately
+                    error = e.response['Error']
+                    if (error['Code'] != 'InvalidParameterValueException'
+                            or 'cannot be assumed' not in error.get('Message', '')
+                            or attempt == ROLE_PROPAGATION_ATTEMPTS - 1):
+                        raise
+                    print("⏳ Waiting for IAM role to propagate...")
+                    time.sleep(ROLE_PROPAGATION_DELAY)
+            
             print(f"✅ Lambda function '{function_name}' created successfully")
+            
+            # Publish a version and point the 'prod' alias at it
+            waiter = self.lambda_client.get_waiter('function_active_v2')
+            waiter.wait(FunctionName=function_name, WaiterConfig=WAITER_CONFIG)
+            version = self.lambda_client.publish_version(FunctionName=function_name)['Version']
+            self.lambda_client.create_alias(
+                FunctionName=function_name,
+                Name='prod',
+                FunctionVersion=version
+            )
+            print(f"✅ Published version {version} as alias 'prod'")
+            
+            if PROVISIONED_CONCURRENCY:
+                self.lambda_client.put_provisioned_concurrency_config(
+                    FunctionName=function_name,
+                    Qualifier='prod',
+                    ProvisionedConcurrentExecutions=PROVISIONED_CONCURRENCY
+                )
+                print(f"✅ Provisioned concurrency set to {PROVISIONED_CONCURRENCY} for alias 'prod'")
+            
             return True
             
-        except Exception as e:
+        except (ClientError, BotoCoreError, OSError) as e:
             print(f"❌ Failed to create Lambda function: {e}")
             return False
     
@@ -401,10 +470,17 @@ class AWSSetup:
             print(f"✅ CloudWatch dashboard '{dashboard_name}' created successfully")
             return True
             
-        except Exception as e:
+        except (ClientError, BotoCoreError) as e:
             print(f"❌ Failed to create CloudWatch dashboard: {e}")
             return False
     
+    def create_role_and_lambda(self) -> Tuple[bool, bool]:
+        """Create the IAM role, then the Lambda function that uses it"""
+        role_arn = self.create_iam_role()
+        if not role_arn:
+            return False, False
+        return True, self.create_lambda_function(role_arn)
+    
     def setup_all(self) -> Dict[str, Any]:
         """Setup all AWS resources"""
         print(f"🚀 Setting up AWS infrastructure for {self.project_name}")
@@ -414,48 +490,44 @@ class AWSSetup:
         
         results = {}
         
-        # Create DynamoDB table
-        results['dynamodb'] = self.create_dynamodb_table()
-        
-        # Create S3 bucket
-        results['s3'] = self.create_s3_bucket()
+        # The resources are independent (only Lambda needs the IAM role), so
+        # create them concurrently; boto3 clients are safe to share across threads
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            dynamodb_future = executor.submit(self.create_dynamodb_table)
+            s3_future = executor.submit(self.create_s3_bucket)
+            lambda_future = executor.submit(self.create_role_and_lambda)
+            cloudwatch_future = executor.submit(self.create_cloudwatch_dashboard)
         
-        # Create IAM role
-        role_arn = self.create_iam_role()
-        results['iam'] = bool(role_arn)
+        results['dynamodb'] = dynamodb_future.result()
+        results['s3'] = s3_future.result()
+        results['iam'], results['lambda'] = lambda_future.result()
+        results['cloudwatch'] = cloudwatch_future.result()
         
-        # Create Lambda function
-        if role_arn:
-            results['lambda'] = self.create_lambda_function(role_arn)
-        else:
-            results['lambda'] = False
-        
-        # Create CloudWatch dashboard
-        results['cloudwatch'] = self.create_cloudwatch_dashboard()
-        
-        # Print summary
-        print("\n" + "="*50)
-        print("🎉 AWS Setup Complete!")
-        print("="*50)
+        # Build the summary and write it in one go
+        lines = ["", "="*50, "🎉 AWS Setup Complete!", "="*50]
         
         for service, success in results.items():
             status = "✅" if success else "❌"
-            print(f"{status} {service.upper()}: {'Success' if success else 'Failed'}")
+            lines.append(f"{status} {service.upper()}: {'Success' if success else 'Failed'}")
         
         if all(results.values()):
-            print("\n🎊 All services set up successfully!")
-            print("\nNext steps:")
-            print("1. Update your .env file with the resource names")
-            print("2. Deploy your agent code")
-            print("3. Test the feedback collection")
-            
-            # Print resource names
-            print(f"\nResource names to use in your .env:")
-            print(f"DYNAMODB_TABLE_NAME={self.project_name}-{self.environment}")
-            print(f"S3_BUCKET_NAME={self.project_name}-{self.environment}-data")
-            print(f"AWS_REGION={self.region}")
+            lines += [
+                "\n🎊 All services set up successfully!",
+                "\nNext steps:",
+                "1. Update your .env file with the resource names",
+                "2. Deploy your agent code",
+                "3. Test the feedback collection",
+                # Resource names
+                "\nResource names to use in your .env:",
+                f"DYNAMODB_TABLE_NAME={self.project_name}-{self.environment}",
+                f"S3_BUCKET_NAME={self.project_name}-{self.environment}-data",
+                f"AWS_REGION={self.region}"
+            ]
         else:
-            print("\n⚠️  Some services failed to set up. Check the errors above.")
+            lines.append("\n⚠️  Some services failed to set up. Check the errors above.")
+        
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
         
         return results
 
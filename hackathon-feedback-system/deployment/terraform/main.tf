@@ -184,7 +184,7 @@ resource "aws_lambda_function" "feedback_processor" {
   function_name    = "${local.name_prefix}-processor"
   role            = aws_iam_role.lambda_role.arn
   handler         = "lambda_function.lambda_handler"
-  runtime         = "python3.11"
+  runtime         = "python3.12"
   timeout         = 30
   memory_size     = 256
 
@@ -6,9 +6,13 @@ Core functions for hackathon feedback collection and processing
 from uagents import Model
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
 import json
 import hashlib
+import heapq
 import asyncio
+import os
+import re
 
 class FeedbackRequest(Model):
     feedback_text: str
@@ -30,6 +34,69 @@ class FeedbackAnalysis(Model):
 # In-memory storage for development (replace with DynamoDB in production)
 feedback_storage = []
 
+# Stored feedback is also appended here, one JSON object per line, so each
+# submission writes only its own record instead of rewriting the whole file
+FEEDBACK_LOG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "feedback_data.jsonl")
+
+# A single writer thread keeps appends in order and off the event loop;
+# pending writes are flushed at interpreter exit
+feedback_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="feedback-writer")
+
+# Keyword tables for the rule-based analysis below, built once at import
+POSITIVE_WORDS = (
+    "excited", "amazing", "great", "awesome", "love", "fantastic", 
+    "excellent", "wonderful", "perfect", "brilliant", "outstanding",
+    "looking forward", "can't wait", "thrilled", "pumped"
+)
+
+NEGATIVE_WORDS = (
+    "worried", "concerned", "disappointed", "bad", "terrible", 
+    "awful", "hate", "horrible", "poor", "lacking", "insufficient",
+    "frustrated", "annoyed", "upset", "anxious"
+)
+
+CATEGORY_KEYWORDS = {
+    "EXPECTATIONS": [
+        "expect", "hope", "goal", "want", "wish", "looking for",
+        "achieve", "learn", "skill", "experience", "outcome"
+    ],
+    "LOGISTICS": [
+        "venue", "location", "food", "accommodation", "parking",
+        "schedule", "timing", "registration", "check-in", "wifi"
+    ],
+    "TECHNICAL": [
+        "api", "tools", "platform", "software", "hardware", 
+        "infrastructure", "development", "coding", "programming"
+    ],
+    "NETWORKING": [
+        "network", "meet", "connect", "team", "collaborate",
+        "mentorship", "mentor", "partner", "social", "community"
+    ],
+    "LEARNING": [
+        "workshop", "tutorial", "session", "presentation", "talk",
+        "education", "training", "skill", "knowledge", "course"
+    ]
+}
+
+# Common words ignored by extract_keywords
+STOP_WORDS = frozenset({
+    "the", "a", "an", "and", "or", "but", "in", "on", "at", "to", 
+    "for", "of", "with", "by", "is", "are", "was", "were", "be",
+    "have", "has", "had", "do", "does", "did", "will", "would",
+    "could", "should", "may", "might", "can", "i", "you", "he",
+    "she", "it", "we", "they", "this", "that", "these", "those"
+})
+
+# Spam checks for validate_feedback, matched against lowercased text
+SPAM_PATTERNS = [
+    re.compile(r'(.)\1{10,}'),  # Repeated characters
+    re.compile(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+'),  # URLs
+    re.compile(r'\b(?:spam|test|asdf|qwerty)\b'),  # Common spam words
+]
+
+# Control characters other than tab and line breaks never appear in real feedback
+CONTROL_CHARS = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
 async def store_feedback(feedback_data: Dict) -> str:
     """
     Store feedback data locally (fallback method)
@@ -38,15 +105,25 @@ async def store_feedback(feedback_data: Dict) -> str:
     try:
         feedback_storage.append(feedback_data)
         
-        # Also save to file for persistence
-        with open("feedback_data.json", "w") as f:
-            json.dump(feedback_storage, f, indent=2, default=str)
+        # Also save to file for persistence, without waiting for the disk
+        line = json.dumps(feedback_data, default=str) + "\n"
+        feedback_writer.submit(append_feedback_line, line).add_done_callback(report_write_error)
         
         return feedback_data["feedback_id"]
     except Exception as e:
         print(f"Error storing feedback: {e}")
         raise
 
+def append_feedback_line(line: str):
+    """Append one serialized record to the feedback log; runs on the writer thread"""
+    with open(FEEDBACK_LOG_FILE, "a") as f:
+        f.write(line)
+
+def report_write_error(future):
+    """Log a failed background write"""
+    if future.exception():
+        print(f"Error storing feedback: {future.exception()}")
+
 async def analyze_feedback_sentiment(feedback_text: str) -> str:
     """
     Analyze sentiment of feedback text
@@ -54,22 +131,10 @@ async def analyze_feedback_sentiment(feedback_text: str) -> str:
     """
     try:
         # Simple rule-based sentiment analysis (fallback)
-        positive_words = [
-            "excited", "amazing", "great", "awesome", "love", "fantastic", 
-            "excellent", "wonderful", "perfect", "brilliant", "outstanding",
-            "looking forward", "can't wait", "thrilled", "pumped"
-        ]
-        
-        negative_words = [
-            "worried", "concerned", "disappointed", "bad", "terrible", 
-            "awful", "hate", "horrible", "poor", "lacking", "insufficient",
-            "frustrated", "annoyed", "upset", "anxious"
-        ]
-        
         text_lower = feedback_text.lower()
         
-        positive_count = sum(1 for word in positive_words if word in text_lower)
-        negative_count = sum(1 for word in negative_words if word in text_lower)
+        positive_count = sum(1 for word in POSITIVE_WORDS if word in text_lower)
+        negative_count = sum(1 for word in NEGATIVE_WORDS if word in text_lower)
         
         if positive_count > negative_count:
             return "positive"
@@ -90,33 +155,9 @@ async def categorize_feedback(feedback_text: str) -> str:
     try:
         text_lower = feedback_text.lower()
         
-        # Category keywords
-        category_keywords = {
-            "EXPECTATIONS": [
-                "expect", "hope", "goal", "want", "wish", "looking for",
-                "achieve", "learn", "skill", "experience", "outcome"
-            ],
-            "LOGISTICS": [
-                "venue", "location", "food", "accommodation", "parking",
-                "schedule", "timing", "registration", "check-in", "wifi"
-            ],
-            "TECHNICAL": [
-                "api", "tools", "platform", "software", "hardware", 
-                "infrastructure", "development", "coding", "programming"
-            ],
-            "NETWORKING": [
-                "network", "meet", "connect", "team", "collaborate",
-                "mentorship", "mentor", "partner", "social", "community"
-            ],
-            "LEARNING": [
-                "workshop", "tutorial", "session", "presentation", "talk",
-                "education", "training", "skill", "knowledge", "course"
-            ]
-        }
-        
         # Count matches for each category
         category_scores = {}
-        for category, keywords in category_keywords.items():
+        for category, keywords in CATEGORY_KEYWORDS.items():
             score = sum(1 for keyword in keywords if keyword in text_lower)
             category_scores[category] = score
         
@@ -136,22 +177,11 @@ async def extract_keywords(feedback_text: str) -> List[str]:
     """
     try:
         # Simple keyword extraction
-        import re
-        
-        # Remove common words
-        stop_words = {
-            "the", "a", "an", "and", "or", "but", "in", "on", "at", "to", 
-            "for", "of", "with", "by", "is", "are", "was", "were", "be",
-            "have", "has", "had", "do", "does", "did", "will", "would",
-            "could", "should", "may", "might", "can", "i", "you", "he",
-            "she", "it", "we", "they", "this", "that", "these", "those"
-        }
-        
         # Extract words (alphanumeric, 3+ characters)
         words = re.findall(r'\b[a-zA-Z]{3,}\b', feedback_text.lower())
         
         # Filter out stop words and get unique keywords
-        keywords = list(set([word for word in words if word not in stop_words]))
+        keywords = list(set([word for word in words if word not in STOP_WORDS]))
         
         # Return top 10 most relevant keywords
         return keywords[:10]
@@ -194,7 +224,7 @@ async def get_feedback_summary(hackathon_id: str) -> Dict:
             category_dist[category] = category_dist.get(category, 0) + 1
         
         # Get recent feedback (last 5)
-        recent = sorted(hackathon_feedback, key=lambda x: x["timestamp"], reverse=True)[:5]
+        recent = heapq.nlargest(5, hackathon_feedback, key=lambda x: x["timestamp"])
         recent_feedback = [
             {
                 "timestamp": f["timestamp"],
@@ -234,6 +264,14 @@ async def validate_feedback(feedback_text: str) -> Tuple[bool, str]:
     Validate feedback text for quality and appropriateness
     Returns: (is_valid, error_message)
     """
+    return check_feedback_text(feedback_text)
+
+def check_feedback_text(feedback_text: str) -> Tuple[bool, str]:
+    """
+    Synchronous checks behind validate_feedback; cheapest checks run first
+    so obviously bad input is rejected before any regex work
+    Returns: (is_valid, error_message)
+    """
     try:
         if not feedback_text or not feedback_text.strip():
             return False, "Feedback cannot be empty"
@@ -244,16 +282,13 @@ async def validate_feedback(feedback_text: str) -> Tuple[bool, str]:
         if len(feedback_text) > 2000:
             return False, "Feedback is too long. Please keep it under 2000 characters."
         
-        # Check for spam patterns
-        spam_patterns = [
-            r'(.)\1{10,}',  # Repeated characters
-            r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+',  # URLs
-            r'\b(?:spam|test|asdf|qwerty)\b',  # Common spam words
-        ]
+        if CONTROL_CHARS.search(feedback_text):
+            return False, "Feedback contains invalid characters"
         
-        import re
-        for pattern in spam_patterns:
-            if re.search(pattern, feedback_text.lower()):
+        # Check for spam patterns (lowercase once for all patterns)
+        text_lower = feedback_text.lower()
+        for pattern in SPAM_PATTERNS:
+            if pattern.search(text_lower):
                 return False, "Feedback appears to be spam or invalid"
         
         return True, ""
@@ -305,7 +340,7 @@ async def get_analytics_data(hackathon_id: str) -> Dict:
         for keyword in all_keywords:
             keyword_counts[keyword] = keyword_counts.get(keyword, 0) + 1
         
-        top_keywords = sorted(keyword_counts.items(), key=lambda x: x[1], reverse=True)[:10]
+        top_keywords = heapq.nlargest(10, keyword_counts.items(), key=lambda x: x[1])
         
         summary.update({
             "hourly_distribution": dict(hourly_submissions),
@@ -23,6 +23,11 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Streamlit reruns the whole script on every filter change; cache the
+# analytics file for a few seconds so reruns don't re-read and re-parse it
+ANALYTICS_CACHE_TTL = 10  # Seconds
+
+@st.cache_data(ttl=ANALYTICS_CACHE_TTL)
 def load_analytics_data():
     """Load and process analytics data"""
     try:
@@ -36,6 +41,7 @@ def load_analytics_data():
         st.error(f"Error loading data: {e}")
         return None
 
+@st.cache_data(ttl=ANALYTICS_CACHE_TTL)
 def create_stories_dataframe(data):
     """Convert stories data to DataFrame for easier filtering"""
     if 'stories' not in data or not data['stories']:
@@ -22,6 +22,8 @@ from datetime import datetime, timezone
 from uuid import uuid4
 from typing import Any, Dict
 from uagents import Model
+from functools import lru_cache
+import asyncio
 import hashlib
 import json
 import re
@@ -57,6 +59,11 @@ USER_STATES = {
     "COUPON_ISSUED": "coupon_issued"
 }
 
+# Phrase tables for message routing, matched as substrings of the lowercased message
+EMAIL_REQUEST_PHRASES = ("send email", "email me", "via email", "by email", "email it")
+PIZZA_REQUEST_WORDS = ("pizza", "coupon", "hungry", "food", "eat")
+BARE_REQUEST_PHRASES = ("i need", "i want", "give me", "can i get", "i'd like")
+
 # Pizza-themed responses for TamuHacks 12.0 (Hacker Mode!)
 INITIAL_RESPONSES = [
     "🍕💻 Hey TamuHacks 12.0 hacker! Your code is compiling, time for a pizza break! ✨\n\nYou're out here building the future, and Fetch.ai wants to fuel your late-night debugging sessions with pizza! 🎓\n\n**Tell me YOUR pizza story!** Maybe it was:\n• That legendary 3am pizza that powered your breakthrough\n• A pizza moment that saved your hackathon project\n• An epic slice during your most intense debugging session\n• Or any other pizza tale from your coding adventures!\n\n🏆 Pro tip: Epic stories unlock bigger pizzas! Everyone gets rewarded! Let's see what pizza.execute() returns! 🚀",
@@ -76,8 +83,9 @@ def create_text_chat(text: str, end_session: bool = False) -> ChatMessage:
         content=content,
     )
 
+@lru_cache(maxsize=4096)
 def get_user_hash(sender: str) -> str:
-    """Generate consistent hash for user identification"""
+    """Generate consistent hash for user identification (memoized per sender)"""
     return hashlib.sha256(sender.encode()).hexdigest()[:8].upper()
 
 def extract_email_from_message(message: str) -> str:
@@ -127,15 +135,12 @@ def set_user_state(ctx: Context, sender: str, state: str):
     ctx.storage.set(f"state_{user_hash}", state)
 
 def has_user_received_coupon(ctx: Context, sender: str) -> bool:
-    """Check if user already received a coupon"""
-    user_hash = get_user_hash(sender)
-    result = ctx.storage.get(f"coupon_issued_{user_hash}")
-    return result if result is not None else False
+    """Check if user already received a coupon (a stored code means issued)"""
+    return bool(get_user_coupon(ctx, sender))
 
 def mark_coupon_issued(ctx: Context, sender: str, coupon_code: str):
     """Mark that user has received a coupon"""
     user_hash = get_user_hash(sender)
-    ctx.storage.set(f"coupon_issued_{user_hash}", True)
     ctx.storage.set(f"coupon_code_{user_hash}", coupon_code)
 
 def get_user_coupon(ctx: Context, sender: str) -> str:
@@ -277,11 +282,10 @@ async def process_user_message(ctx: Context, sender: str, message: str):
         analytics.record_request(sender)
     
     # Check if user already has a coupon
-    if has_user_received_coupon(ctx, sender):
-        existing_coupon = get_user_coupon(ctx, sender)
-        
+    existing_coupon = get_user_coupon(ctx, sender)
+    if existing_coupon:
         # Check if user is requesting email delivery
-        if any(phrase in message_lower for phrase in ["send email", "email me", "via email", "by email", "email it"]):
+        if any(phrase in message_lower for phrase in EMAIL_REQUEST_PHRASES):
             user_email = extract_email_from_message(message)
             if user_email and validate_email(user_email):
                 # Try to send email
@@ -344,7 +348,7 @@ async def process_user_message(ctx: Context, sender: str, message: str):
     
     if user_state == USER_STATES["INITIAL"]:
         # User is asking for pizza - send story prompt
-        if any(word in message_lower for word in ["pizza", "coupon", "hungry", "food", "eat"]):
+        if any(word in message_lower for word in PIZZA_REQUEST_WORDS):
             if USE_AI_PROMPTS:
                 try:
                     # Generate dynamic prompt using Gemini
@@ -389,7 +393,7 @@ async def process_user_message(ctx: Context, sender: str, message: str):
         # User provided a story - evaluate it
         
         # Check if user is just repeating their initial request instead of telling a story
-        if any(word in message_lower for word in ["i need", "i want", "give me", "can i get", "i'd like"]) and len(clean_message) < 50:
+        if any(word in message_lower for word in BARE_REQUEST_PHRASES) and len(clean_message) < 50:
             await ctx.send(
                 sender,
                 create_text_chat(
@@ -414,49 +418,61 @@ async def process_user_message(ctx: Context, sender: str, message: str):
             )
             return
         
-        # AI-powered spam detection (optional)
-        if USE_AI_MODERATION:
-            is_suspicious, reason = await ai_detect_spam_or_abuse(clean_message)
-            if is_suspicious:
-                ctx.logger.warning(f"Suspicious message from {sender}: {reason}")
-                await ctx.send(
-                    sender,
-                    create_text_chat(
-                        "🤔 Hmm, that doesn't seem like a genuine pizza story. "
-                        "Try sharing a real personal experience with pizza! 🍕"
+        # Story evaluation and moderation are independent AI calls, so start
+        # the evaluation now and let it run while moderation checks the story
+        evaluation_task = None
+        if USE_AI_EVALUATION:
+            evaluate = gemini_evaluate_story if USE_GEMINI else ai_evaluate_story
+            evaluation_task = asyncio.create_task(evaluate(clean_message))
+        
+        try:
+            # AI-powered spam detection (optional)
+            if USE_AI_MODERATION:
+                is_suspicious, reason = await ai_detect_spam_or_abuse(clean_message)
+                if is_suspicious:
+                    ctx.logger.warning(f"Suspicious message from {sender}: {reason}")
+                    await ctx.send(
+                        sender,
+                        create_text_chat(
+                            "🤔 Hmm, that doesn't seem like a genuine pizza story. "
+                            "Try sharing a real personal experience with pizza! 🍕"
+                        )
                     )
-                )
-                return
+                    return
         
-        set_user_state(ctx, sender, USER_STATES["STORY_RECEIVED"])
+            set_user_state(ctx, sender, USER_STATES["STORY_RECEIVED"])
         
-        if USE_AI_EVALUATION:
-            # Use Gemini AI for story evaluation
-            try:
-                if USE_GEMINI:
-                    story_rating, explanation = await gemini_evaluate_story(clean_message)
-                    ctx.logger.info(f"Gemini evaluated story: rating={story_rating}, explanation={explanation}")
-                else:
-                    story_rating, explanation = await ai_evaluate_story(clean_message)
-                    ctx.logger.info(f"AI evaluated story: rating={story_rating}, explanation={explanation}")
+            if USE_AI_EVALUATION:
+                # Use Gemini AI for story evaluation
+                try:
+                    story_rating, explanation = await evaluation_task
+                    if USE_GEMINI:
+                        ctx.logger.info(f"Gemini evaluated story: rating={story_rating}, explanation={explanation}")
+                    else:
+                        ctx.logger.info(f"AI evaluated story: rating={story_rating}, explanation={explanation}")
                 
-                # Generate coupon immediately
-                await process_coupon_generation(ctx, sender, clean_message, story_rating, message)
+                    # Generate coupon immediately
+                    await process_coupon_generation(ctx, sender, clean_message, story_rating, message)
                 
-            except Exception as e:
-                ctx.logger.error(f"AI evaluation failed: {e}")
-                # Fallback to rule-based evaluation
-                story_rating = evaluate_story_quality(clean_message)
-                await process_coupon_generation(ctx, sender, clean_message, story_rating, message)
-        else:
-            # Send story to structured output AI agent (original approach)
-            await ctx.send(
-                AI_AGENT_ADDRESS,
-                StructuredOutputPrompt(
-                    prompt=f"Evaluate this pizza story for creativity and engagement (scale 1-10): {message}",
-                    output_schema=PizzaRequest.schema()
-                ),
-            )
+                except Exception as e:
+                    ctx.logger.error(f"AI evaluation failed: {e}")
+                    # Fallback to rule-based evaluation
+                    story_rating = evaluate_story_quality(clean_message)
+                    await process_coupon_generation(ctx, sender, clean_message, story_rating, message)
+            else:
+                # Send story to structured output AI agent (original approach)
+                await ctx.send(
+                    AI_AGENT_ADDRESS,
+                    StructuredOutputPrompt(
+                        prompt=f"Evaluate this pizza story for creativity and engagement (scale 1-10): {message}",
+                        output_schema=PizzaRequest.schema()
+                    ),
+                )
+        finally:
+            # An evaluation that was not awaited (spam, or moderation raising)
+            # must not keep calling the API with nobody reading its result
+            if evaluation_task and not evaluation_task.done():
+                evaluation_task.cancel()
     
     else:
         # Invalid state or already processed
@@ -3,24 +3,20 @@
 AI-powered functions using Gemini API instead of static pattern matching
 """
 
-import os
-from dotenv import load_dotenv
-import google.generativeai as genai
 from typing import Dict, Tuple, Optional
 import asyncio
 import json
+import random
+import re
 from datetime import datetime
+from functions import evaluate_story_quality
+from gemini_functions import gemini_model, gemini_generate_content, story_cache_key, get_cached_evaluation, cache_evaluation
 
-# Load environment variables from .env file
-load_dotenv()
+# The Gemini client is configured once in gemini_functions (which loads .env)
+# and shared here, so both modules reuse one model object and its connections
 
-# Initialize Gemini client
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
-    gemini_model = genai.GenerativeModel('models/gemini-2.5-flash')
-else:
-    gemini_model = None
+# First {...} block in a model reply
+JSON_OBJECT_RE = re.compile(r'\{.*\}', re.DOTALL)
 
 async def ai_evaluate_story(story: str) -> Tuple[int, str]:
     """
@@ -29,10 +25,15 @@ async def ai_evaluate_story(story: str) -> Tuple[int, str]:
     """
     
     if not gemini_model:
-        from functions import evaluate_story_quality
         fallback_rating = evaluate_story_quality(story)
         return fallback_rating, "Used fallback evaluation (Gemini not configured)"
     
+    # Same prompt and model as gemini_evaluate_story, so the two share its cache
+    story_key = story_cache_key(story)
+    cached = get_cached_evaluation(story_key)
+    if cached:
+        return cached
+    
     prompt = f"""
     You are a fun pizza story evaluator for a conference coupon system. 
     Rate this pizza story on a scale of 1-10 based on:
@@ -50,25 +51,23 @@ async def ai_evaluate_story(story: str) -> Tuple[int, str]:
     """
     
     try:
-        response = await asyncio.to_thread(gemini_model.generate_content, prompt)
+        response = await gemini_generate_content(prompt)
         if response and response.text:
             # Try to parse JSON response
-            import re
-            json_match = re.search(r'\{.*\}', response.text, re.DOTALL)
+            json_match = JSON_OBJECT_RE.search(response.text)
             if json_match:
                 result = json.loads(json_match.group())
                 rating = min(10, max(1, int(result.get('rating', 5))))
                 explanation = result.get('explanation', 'Gemini evaluation completed')
+                cache_evaluation(story_key, (rating, explanation))
                 return rating, explanation
         
         # Fallback to rule-based if AI fails
-        from functions import evaluate_story_quality
         fallback_rating = evaluate_story_quality(story)
         return fallback_rating, "Used fallback evaluation (Gemini unavailable)"
         
     except Exception as e:
         print(f"Gemini evaluation error: {e}")
-        from functions import evaluate_story_quality
         fallback_rating = evaluate_story_quality(story)
         return fallback_rating, "Used fallback evaluation (Gemini error)"
 
@@ -105,7 +104,7 @@ async def ai_generate_personalized_response(story: str, rating: int, tier: str,
     """
     
     try:
-        response = await asyncio.to_thread(gemini_model.generate_content, prompt)
+        response = await gemini_generate_content(prompt)
         if response and response.text:
             return response.text.strip()
     except Exception as e:
@@ -161,10 +160,9 @@ async def ai_detect_spam_or_abuse(message: str, user_history: list = None) -> Tu
     """
     
     try:
-        response = await asyncio.to_thread(gemini_model.generate_content, prompt)
+        response = await gemini_generate_content(prompt)
         if response and response.text:
-            import re
-            json_match = re.search(r'\{.*\}', response.text, re.DOTALL)
+            json_match = JSON_OBJECT_RE.search(response.text)
             if json_match:
                 result = json.loads(json_match.group())
                 return result.get('suspicious', False), result.get('reason', 'Gemini analysis')
@@ -229,10 +227,9 @@ async def ai_understand_user_intent(message: str) -> Dict[str, any]:
     """
     
     try:
-        response = await asyncio.to_thread(gemini_model.generate_content, prompt)
+        response = await gemini_generate_content(prompt)
         if response and response.text:
-            import re
-            json_match = re.search(r'\{.*\}', response.text, re.DOTALL)
+            json_match = JSON_OBJECT_RE.search(response.text)
             if json_match:
                 return json.loads(json_match.group())
     except Exception as e:
@@ -264,7 +261,6 @@ async def ai_generate_dynamic_prompts() -> str:
     
     if not gemini_model:
         # Fallback with TamuHacks theme
-        import random
         fallback_prompts = [
             "🍕 Hey TamuHacks hacker! Welcome to Fetch.ai's Pizza Paradise! ✨\n\nYou're crushing code, building amazing projects, and bringing innovation from universities across the country - you definitely deserve pizza! 🎓\n\nBut first, I need to hear your most epic pizza story! Tell me about:\n• Your craziest late-night coding pizza session\n• Your dream hackathon fuel (aka pizza combo)\n• A time pizza saved your project\n• Or any pizza-related tale!\n\nThe more creative and fun your story, the better your coupon! Fetch.ai is here to fuel your innovation! 🎭🚀",
             "🍕 Greetings, TamuHacks innovator! I'm the Pizza Genie! 🧞‍♂️\n\nFetch.ai sees you grinding away at this hackathon, bringing brilliant ideas from campuses nationwide! You've earned a pizza break! 🎓✨\n\nTo unlock your pizza treasures, complete the ancient ritual of... STORYTELLING! 📚\n\nShare your most legendary pizza tale:\n• The weirdest topping combo during an all-nighter\n• Your best pizza-fueled hackathon memory\n• Why hackers like you deserve free pizza\n• A pizza moment that kept you going\n\nMake it interesting - boring stories get basic coupons! 😉🚀",
@@ -291,14 +287,13 @@ async def ai_generate_dynamic_prompts() -> str:
     """
     
     try:
-        response = await asyncio.to_thread(gemini_model.generate_content, prompt)
+        response = await gemini_generate_content(prompt)
         if response and response.text:
             return response.text.strip()
     except Exception as e:
         print(f"Gemini prompt generation error: {e}")
     
     # Fallback with TamuHacks theme
-    import random
     fallback_prompts = [
         "🍕 Hey TamuHacks hacker! Welcome to Fetch.ai's Pizza Paradise! ✨\n\nYou're crushing code, building amazing projects, and bringing innovation from universities across the country - you definitely deserve pizza! 🎓\n\nBut first, I need to hear your most epic pizza story! Tell me about:\n• Your craziest late-night coding pizza session\n• Your dream hackathon fuel (aka pizza combo)\n• A time pizza saved your project\n• Or any pizza-related tale!\n\nThe more creative and fun your story, the better your coupon! Fetch.ai is here to fuel your innovation! 🎭🚀",
         "🍕 Greetings, TamuHacks innovator! I'm the Pizza Genie! 🧞‍♂️\n\nFetch.ai sees you grinding away at this hackathon, bringing brilliant ideas from campuses nationwide! You've earned a pizza break! 🎓✨\n\nTo unlock your pizza treasures, complete the ancient ritual of... STORYTELLING! 📚\n\nShare your most legendary pizza tale:\n• The weirdest topping combo during an all-nighter\n• Your best pizza-fueled hackathon memory\n• Why hackers like you deserve free pizza\n• A pizza moment that kept you going\n\nMake it interesting - boring stories get basic coupons! 😉🚀",
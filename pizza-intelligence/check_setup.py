@@ -4,9 +4,29 @@ Quick setup checker for Pizza Intelligence
 """
 
 import os
+from importlib.util import find_spec
 from email_utils import test_email_configuration
 from config import USE_GEMINI, USE_AI_EVALUATION, USE_AI_RESPONSES, USE_AI_PROMPTS
 
+# (module, display name, pip package) - checked for presence without importing
+DEPENDENCIES = [
+    ("quart", "Quart", "quart"),
+    ("orjson", "orjson", "orjson"),
+    ("brotli", "Brotli", "brotli"),
+    ("uvicorn", "Uvicorn", "'uvicorn[standard]'"),
+    ("uvloop", "uvloop (uvicorn[standard])", "'uvicorn[standard]'"),
+    ("httptools", "httptools (uvicorn[standard])", "'uvicorn[standard]'"),
+    ("gunicorn", "Gunicorn", "gunicorn"),
+    ("google.generativeai", "Google Generative AI", "google-generativeai"),
+]
+
+def is_installed(module_name):
+    """Check a module can be imported without executing it"""
+    try:
+        return find_spec(module_name) is not None
+    except ModuleNotFoundError:  # Parent package missing
+        return False
+
 def check_setup():
     print("🍕 Pizza Intelligence - Setup Check")
     print("=" * 50)
@@ -34,21 +54,20 @@ def check_setup():
     
     # Check dependencies
     print("\n📦 Dependencies:")
-    try:
-        import flask
-        print("   ✅ Flask installed")
-    except ImportError:
-        print("   ❌ Flask not installed - run: pip install flask")
-    
-    try:
-        import google.generativeai
-        print("   ✅ Google Generative AI installed")
-    except ImportError:
-        print("   ❌ Google Generative AI not installed - run: pip install google-generativeai")
+    missing = []
+    for module_name, name, package in DEPENDENCIES:
+        if is_installed(module_name):
+            print(f"   ✅ {name} installed")
+        else:
+            missing.append(name)
+            print(f"   ❌ {name} not installed - run: pip install {package}")
     
     # Overall status
     print("\n🎯 Overall Status:")
-    if email_config['configured'] and gemini_key:
+    if missing:
+        print(f"   ❌ Missing dependencies: {', '.join(missing)}")
+        print("   💡 Tip: pip install -r requirements.txt")
+    elif email_config['configured'] and gemini_key:
         print("   🚀 Ready for production! All features enabled.")
     elif email_config['configured']:
         print("   👍 Ready to go! Email works, AI features will use fallbacks.")
@@ -13,6 +13,7 @@ import os
 from dotenv import load_dotenv
 from typing import Optional
 import re
+import time
 
 load_dotenv()
 
@@ -23,10 +24,16 @@ EMAIL_ADDRESS = os.getenv("EMAIL_ADDRESS", "")
 EMAIL_PASSWORD = os.getenv("EMAIL_PASSWORD", "")
 EMAIL_FROM_NAME = os.getenv("EMAIL_FROM_NAME", "Pizza Agent")
 
+# Compiled once at import; addresses longer than RFC 5321 allows are
+# rejected before the regex runs
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+MAX_EMAIL_LENGTH = 254
+
 def validate_email(email: str) -> bool:
     """Validate email format"""
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email) is not None
+    if len(email) > MAX_EMAIL_LENGTH:
+        return False
+    return EMAIL_PATTERN.match(email) is not None
 
 def create_coupon_email(recipient_email: str, coupon_code: str, tier: str, story_rating: int, personalized_message: str = "") -> MIMEMultipart:
     """Create a formatted email with the pizza coupon"""
@@ -251,6 +258,19 @@ def test_email_configuration() -> dict:
     except Exception as e:
         return {"configured": False, "message": f"Email configuration error: {str(e)}"}
 
+# An SMTP login check takes hundreds of ms and is rate-limited by the provider,
+# so status endpoints reuse the last result for this many seconds
+EMAIL_STATUS_TTL = 60.0
+email_status_cache = {"checked_at": 0.0, "result": None}
+
+def get_email_configuration_status() -> dict:
+    """test_email_configuration(), cached for EMAIL_STATUS_TTL seconds"""
+    now = time.monotonic()
+    if email_status_cache["result"] is None or now - email_status_cache["checked_at"] > EMAIL_STATUS_TTL:
+        email_status_cache["result"] = test_email_configuration()
+        email_status_cache["checked_at"] = now
+    return email_status_cache["result"]
+
 if __name__ == "__main__":
     # Test email configuration
     result = test_email_configuration()
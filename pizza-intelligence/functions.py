@@ -2,7 +2,8 @@
 from uagents import Model
 from datetime import datetime
 import hashlib
-import random
+import re
+from secrets import token_hex
 from typing import Tuple
 
 class PizzaRequest(Model):
@@ -20,9 +21,18 @@ COUPON_TIERS = {
     "BASIC": {"min_rating": 1, "size": "REGULAR", "prefix": "BASIC"}
 }
 
+# Rating (0-10) -> tier lookup, matches the min_rating thresholds above
+RATING_TIERS = ("BASIC",) * 6 + ("STANDARD",) * 2 + ("PREMIUM",) * 3
+
 # Conference identifier - change this for different events
 CONFERENCE_ID = "CONF24"
 
+# Story keyword matchers for evaluate_story_quality (substring matches,
+# so "pizzas" and "toppings" still count)
+PIZZA_WORDS_RE = re.compile("pizza|cheese|pepperoni|crust|slice|topping|sauce")
+CREATIVE_WORDS_RE = re.compile("amazing|incredible|adventure|story|funny|crazy|epic")
+EMOTION_WORDS_RE = re.compile("love|hate|happy|sad|excited|disappointed|surprised")
+
 def generate_coupon_code(user_identifier: str, story_rating: int, use_random: bool = False) -> Tuple[str, str]:
     """
     Generate a unique coupon code based on user and story rating
@@ -34,23 +44,16 @@ def generate_coupon_code(user_identifier: str, story_rating: int, use_random: bo
         use_random: If True, use random code. If False, use deterministic hash
     """
     # Determine tier based on rating
-    if story_rating >= 8:
-        tier = "PREMIUM"
-    elif story_rating >= 6:
-        tier = "STANDARD"
-    else:
-        tier = "BASIC"
+    tier = RATING_TIERS[min(10, max(0, story_rating))]
+    timestamp = datetime.now().strftime("%H%M")
     
     if use_random:
         # Option 1: Completely Random
-        import secrets
-        random_part = secrets.token_hex(4).upper()  # 8 random characters
-        timestamp = datetime.now().strftime("%H%M")
+        random_part = token_hex(4).upper()  # 8 random characters
         coupon_code = f"PIZZA-{CONFERENCE_ID}-{tier}-{random_part}-{timestamp}"
     else:
         # Option 2: Deterministic (current approach)
         user_hash = hashlib.sha256(user_identifier.encode()).hexdigest()[:6].upper()
-        timestamp = datetime.now().strftime("%H%M")
         coupon_code = f"PIZZA-{CONFERENCE_ID}-{tier}-{user_hash}-{timestamp}"
     
     return coupon_code, tier
@@ -72,27 +75,22 @@ def evaluate_story_quality(story: str) -> int:
     if len(story) > 200:
         score += 1
         
-    # Creativity indicators
-    pizza_words = ["pizza", "cheese", "pepperoni", "crust", "slice", "topping", "sauce"]
-    creative_words = ["amazing", "incredible", "adventure", "story", "funny", "crazy", "epic"]
-    emotion_words = ["love", "hate", "happy", "sad", "excited", "disappointed", "surprised"]
-    
-    # Pizza relevance
-    pizza_mentions = sum(1 for word in pizza_words if word in story_lower)
+    # Pizza relevance (number of distinct keywords found)
+    pizza_mentions = len(set(PIZZA_WORDS_RE.findall(story_lower)))
     if pizza_mentions >= 2:
         score += 1
     if pizza_mentions >= 4:
         score += 1
         
     # Creativity bonus
-    creative_mentions = sum(1 for word in creative_words if word in story_lower)
+    creative_mentions = len(set(CREATIVE_WORDS_RE.findall(story_lower)))
     if creative_mentions >= 1:
         score += 1
     if creative_mentions >= 3:
         score += 1
         
     # Emotion bonus
-    emotion_mentions = sum(1 for word in emotion_words if word in story_lower)
+    emotion_mentions = len(set(EMOTION_WORDS_RE.findall(story_lower)))
     if emotion_mentions >= 1:
         score += 1
         
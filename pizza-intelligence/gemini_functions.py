@@ -10,7 +10,13 @@ from typing import Tuple, Dict
 import json
 import asyncio
 from functools import wraps
+from collections import OrderedDict
+import hashlib
+import random
+import re
+import threading
 import time
+from functions import evaluate_story_quality
 
 # Load environment variables
 load_dotenv()
@@ -29,6 +35,88 @@ max_failures_before_fallback = 3  # After 3 failures, use static for next reques
 GEMINI_TIMEOUT = float(os.getenv("GEMINI_TIMEOUT", "10.0"))  # Timeout in seconds
 GEMINI_RETRY_COUNT = int(os.getenv("GEMINI_RETRY_COUNT", "2"))  # Number of retries
 
+# Client-side request budget: bursts queue briefly here instead of exceeding
+# the API's per-minute quota and falling into timeouts and retries
+GEMINI_RPM = float(os.getenv("GEMINI_RPM", "60"))  # 0 disables the limiter
+
+class RequestRateLimiter:
+    """Token bucket allowing short bursts, refilled at requests_per_minute"""
+    
+    def __init__(self, requests_per_minute: float, burst_seconds: float = 10.0):
+        self.rate = requests_per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        # A thread lock, not an asyncio.Lock: the limiter is shared by every
+        # event loop in the process (repeated asyncio.run calls, the uAgents loop)
+        self.lock = threading.Lock()
+    
+    def reserve(self) -> float:
+        """Take a token, going into debt if none is left; returns the seconds
+        to wait before the reserved request may be sent"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            return max(0.0, -self.tokens / self.rate)
+    
+    async def acquire(self):
+        """Wait until a request token is available, then take it"""
+        delay = self.reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+gemini_rate_limiter = RequestRateLimiter(GEMINI_RPM) if GEMINI_RPM > 0 else None
+
+async def gemini_generate_content(prompt: str, timeout: float = None):
+    """generate_content in a worker thread, after the rate limiter admits it;
+    the timeout covers only the API call, not time spent queued"""
+    if gemini_rate_limiter:
+        await gemini_rate_limiter.acquire()
+    return await asyncio.wait_for(
+        asyncio.to_thread(gemini_model.generate_content, prompt),
+        timeout=timeout
+    )
+
+# First {...} block in a model reply
+JSON_OBJECT_RE = re.compile(r'\{.*\}', re.DOTALL)
+
+TIER_DESCRIPTIONS = {
+    "PREMIUM": "LARGE pizza with PREMIUM toppings",
+    "STANDARD": "MEDIUM pizza with classic toppings",
+    "BASIC": "PERSONAL pizza"
+}
+
+# Successful story evaluations keyed by story digest, so repeat
+# submissions skip the Gemini round-trip
+STORY_CACHE_SIZE = 4096
+STORY_CACHE_TTL = float(os.getenv("STORY_CACHE_TTL", "3600"))  # Seconds
+story_evaluation_cache = OrderedDict()
+
+def story_cache_key(story: str) -> str:
+    """Digest of the story text; evaluations are a function of the story alone"""
+    return hashlib.blake2b(story.encode(), digest_size=16).hexdigest()
+
+def get_cached_evaluation(story_key: str):
+    """Return a cached (rating, explanation) if it has not expired"""
+    cached = story_evaluation_cache.get(story_key)
+    if cached is None:
+        return None
+    cached_at, evaluation = cached
+    if time.monotonic() - cached_at > STORY_CACHE_TTL:
+        del story_evaluation_cache[story_key]
+        return None
+    story_evaluation_cache.move_to_end(story_key)
+    return evaluation
+
+def cache_evaluation(story_key: str, evaluation: Tuple[int, str]):
+    """Store an evaluation, evicting the least recently used entry when full"""
+    story_evaluation_cache[story_key] = (time.monotonic(), evaluation)
+    story_evaluation_cache.move_to_end(story_key)
+    if len(story_evaluation_cache) > STORY_CACHE_SIZE:
+        story_evaluation_cache.popitem(last=False)
+
 def get_gemini_status() -> dict:
     """Get current Gemini status for monitoring"""
     global gemini_failures
@@ -80,15 +168,11 @@ async def gemini_understand_intent(message: str, retry_count: int = None) -> Dic
     for attempt in range(retry_count):
         try:
             # Use asyncio to add timeout functionality
-            response = await asyncio.wait_for(
-                asyncio.to_thread(gemini_model.generate_content, prompt),
-                timeout=GEMINI_TIMEOUT
-            )
+            response = await gemini_generate_content(prompt, timeout=GEMINI_TIMEOUT)
             
             result = response.text.strip()
             # Try to parse JSON
-            import re
-            json_match = re.search(r'\{.*\}', result, re.DOTALL)
+            json_match = JSON_OBJECT_RE.search(result)
             if json_match:
                 intent_data = json.loads(json_match.group())
                 # Success - reset failure counter
@@ -128,12 +212,10 @@ async def gemini_generate_unique_prompt(retry_count: int = None) -> str:
     global gemini_failures
     if gemini_failures >= max_failures_before_fallback:
         print(f"Skipping Gemini prompt generation (too many failures: {gemini_failures}), using fallback")
-        import random
         return random.choice(get_fallback_prompts())
     
     if not gemini_model:
         # Fallback to static prompts
-        import random
         fallback_prompts = get_fallback_prompts()
         return random.choice(fallback_prompts)
     
@@ -167,10 +249,7 @@ async def gemini_generate_unique_prompt(retry_count: int = None) -> str:
     
     for attempt in range(retry_count):
         try:
-            response = await asyncio.wait_for(
-                asyncio.to_thread(gemini_model.generate_content, prompt),
-                timeout=GEMINI_TIMEOUT
-            )
+            response = await gemini_generate_content(prompt, timeout=GEMINI_TIMEOUT)
             
             # Success - reset failure counter
             gemini_failures = max(0, gemini_failures - 1)
@@ -188,7 +267,6 @@ async def gemini_generate_unique_prompt(retry_count: int = None) -> str:
     # All attempts failed - increment failure counter and use fallback
     gemini_failures += 1
     print(f"Gemini prompt generation failed after {retry_count} attempts (total failures: {gemini_failures})")
-    import random
     fallback_prompts = get_fallback_prompts()
     return random.choice(fallback_prompts)
 
@@ -210,12 +288,6 @@ async def gemini_generate_response_message(story: str, rating: int, tier: str, c
     if not gemini_model:
         return generate_static_response(rating, coupon_code, tier)
     
-    tier_descriptions = {
-        "PREMIUM": "LARGE pizza with PREMIUM toppings",
-        "STANDARD": "MEDIUM pizza with classic toppings",
-        "BASIC": "PERSONAL pizza"
-    }
-    
     prompt = f"""
     Generate a fun, personalized response to this pizza story from a TamuHacks 12.0 hacker.
     
@@ -223,7 +295,7 @@ async def gemini_generate_response_message(story: str, rating: int, tier: str, c
     Rating: {rating}/10
     Coupon Tier: {tier}
     Coupon Code: {coupon_code}
-    Pizza Reward: {tier_descriptions.get(tier, "pizza")}
+    Pizza Reward: {TIER_DESCRIPTIONS.get(tier, "pizza")}
     
     Create a response that:
     1. Acknowledges something specific from their story (be genuine!)
@@ -242,10 +314,7 @@ async def gemini_generate_response_message(story: str, rating: int, tier: str, c
     
     for attempt in range(retry_count):
         try:
-            response = await asyncio.wait_for(
-                asyncio.to_thread(gemini_model.generate_content, prompt),
-                timeout=GEMINI_TIMEOUT
-            )
+            response = await gemini_generate_content(prompt, timeout=GEMINI_TIMEOUT)
             
             # Success - reset failure counter
             gemini_failures = max(0, gemini_failures - 1)
@@ -275,16 +344,19 @@ async def gemini_evaluate_story(story: str, retry_count: int = None) -> Tuple[in
     if retry_count is None:
         retry_count = GEMINI_RETRY_COUNT
     
+    story_key = story_cache_key(story)
+    cached = get_cached_evaluation(story_key)
+    if cached:
+        return cached
+    
     # Check if too many failures - skip to fallback
     global gemini_failures
     if gemini_failures >= max_failures_before_fallback:
         print(f"Skipping Gemini story evaluation (too many failures: {gemini_failures}), using fallback")
-        from functions import evaluate_story_quality
         fallback_rating = evaluate_story_quality(story)
         return fallback_rating, "Used fallback evaluation (Gemini unavailable)"
     
     if not gemini_model:
-        from functions import evaluate_story_quality
         fallback_rating = evaluate_story_quality(story)
         return fallback_rating, "Used fallback evaluation (Gemini not configured)"
     
@@ -306,21 +378,18 @@ async def gemini_evaluate_story(story: str, retry_count: int = None) -> Tuple[in
     
     for attempt in range(retry_count):
         try:
-            response = await asyncio.wait_for(
-                asyncio.to_thread(gemini_model.generate_content, prompt),
-                timeout=GEMINI_TIMEOUT
-            )
+            response = await gemini_generate_content(prompt, timeout=GEMINI_TIMEOUT)
             
             if response and response.text:
                 # Try to parse JSON response
-                import re
-                json_match = re.search(r'\{.*\}', response.text, re.DOTALL)
+                json_match = JSON_OBJECT_RE.search(response.text)
                 if json_match:
                     result = json.loads(json_match.group())
                     rating = min(10, max(1, int(result.get('rating', 5))))
                     explanation = result.get('explanation', 'Gemini evaluation completed')
                     # Success - reset failure counter
                     gemini_failures = max(0, gemini_failures - 1)
+                    cache_evaluation(story_key, (rating, explanation))
                     return rating, explanation
             
         except asyncio.TimeoutError:
@@ -337,7 +406,6 @@ async def gemini_evaluate_story(story: str, retry_count: int = None) -> Tuple[in
     print(f"Gemini story evaluation failed after {retry_count} attempts (total failures: {gemini_failures})")
     
     # Fallback to rule-based if Gemini fails
-    from functions import evaluate_story_quality
     fallback_rating = evaluate_story_quality(story)
     return fallback_rating, "Used fallback evaluation (Gemini error)"
 
@@ -0,0 +1,16 @@
+# gunicorn_conf.py
+"""
+Gunicorn settings for serving pizza_coupon_app with Uvicorn workers
+Usage: gunicorn -c gunicorn_conf.py pizza_coupon_app:app
+Test interface: BIND=127.0.0.1:5001 gunicorn -c gunicorn_conf.py web_test_interface:app
+"""
+
+import multiprocessing
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:5002")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "uvicorn.workers.UvicornWorker"
+keepalive = 75
+backlog = 2048
+reuse_port = True
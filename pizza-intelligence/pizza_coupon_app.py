@@ -4,16 +4,27 @@ Pizza Intelligence - User Interface
 Clean, production-ready interface for users to get pizza coupons
 """
 
-from flask import Flask, render_template_string, request, jsonify
+from quart import Quart, Response, request
 import asyncio
+import gzip
+import hashlib
+import orjson
+import os
+import tempfile
+import time
 from functions import generate_coupon_code, evaluate_story_quality
 from ai_functions import ai_evaluate_story, ai_generate_personalized_response, ai_generate_dynamic_prompts
-from gemini_functions import gemini_evaluate_story, gemini_generate_response_message, gemini_generate_unique_prompt
+from gemini_functions import gemini_evaluate_story, gemini_generate_response_message, gemini_generate_unique_prompt, get_gemini_status
 from config import USE_GEMINI, USE_AI_EVALUATION, USE_AI_RESPONSES, USE_AI_PROMPTS
 from email_utils import send_coupon_email, test_email_configuration, validate_email
 import json
 
-app = Flask(__name__)
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+app = Quart(__name__)
 
 # Main user interface template
 USER_TEMPLATE = """
@@ -404,6 +415,66 @@ USER_TEMPLATE = """
             return `<span class="rating-display">⭐ ${rating}/10</span>`;
         }
         
+        // Email delivery status box
+        function formatEmailStatus(result, email) {
+            if (result.email_status === 'queued') {
+                return `
+                    <div class="email-status email-success">
+                        📧 ✉️ ${result.email_message}!<br>
+                        <small>It should arrive in your inbox shortly.</small>
+                    </div>
+                `;
+            } else if (result.email_sent) {
+                return `
+                    <div class="email-status email-success">
+                        📧 ✅ Coupon sent successfully to ${email}!<br>
+                        <small>${result.email_message}</small>
+                    </div>
+                `;
+            }
+            return `
+                <div class="email-status email-error">
+                    📧 ❌ Failed to send email to ${email}<br>
+                    <small>${result.email_message}</small><br>
+                    <em>Don't worry! Your coupon code below still works perfectly.</em>
+                </div>
+            `;
+        }
+        
+        // Emails are sent in the background; poll until the send finishes
+        // so delivery failures are still reported
+        async function watchEmailStatus(couponCode, email) {
+            for (let attempt = 0; attempt < 30; attempt++) {
+                await new Promise((resolve) => setTimeout(resolve, 1000));
+                try {
+                    const response = await fetch(`/email_status/${encodeURIComponent(couponCode)}`);
+                    // A 404 or a network error can be transient; keep polling
+                    if (!response.ok) {
+                        continue;
+                    }
+                    const status = await response.json();
+                    if (status.email_status !== 'queued') {
+                        const statusDiv = document.getElementById('emailStatus');
+                        if (statusDiv) {
+                            statusDiv.innerHTML = formatEmailStatus(status, email);
+                        }
+                        return;
+                    }
+                } catch (error) {
+                    continue;
+                }
+            }
+            const statusDiv = document.getElementById('emailStatus');
+            if (statusDiv) {
+                statusDiv.innerHTML = `
+                    <div class="email-status email-success">
+                        📧 ⏳ Your coupon email is still being sent.<br>
+                        <small>Check your inbox in a few minutes; your coupon code below works either way.</small>
+                    </div>
+                `;
+            }
+        }
+        
         // Handle form submission
         document.getElementById('pizzaForm').addEventListener('submit', async function(e) {
             e.preventDefault();
@@ -440,25 +511,9 @@ USER_TEMPLATE = """
                 }
                 
                 // Display results
-                let emailStatusHtml = '';
-                if (email) {
-                    if (result.email_sent) {
-                        emailStatusHtml = `
-                            <div class="email-status email-success">
-                                📧 ✅ Coupon sent successfully to ${email}!<br>
-                                <small>${result.email_message}</small>
-                            </div>
-                        `;
-                    } else {
-                        emailStatusHtml = `
-                            <div class="email-status email-error">
-                                📧 ❌ Failed to send email to ${email}<br>
-                                <small>${result.email_message}</small><br>
-                                <em>Don't worry! Your coupon code below still works perfectly.</em>
-                            </div>
-                        `;
-                    }
-                }
+                const emailStatusHtml = email
+                    ? `<div id="emailStatus">${formatEmailStatus(result, email)}</div>`
+                    : '';
                 
                 resultDiv.innerHTML = `
                     <div class="coupon-display">
@@ -501,6 +556,10 @@ USER_TEMPLATE = """
                 // Scroll to results
                 resultDiv.scrollIntoView({ behavior: 'smooth' });
                 
+                if (email && result.email_status === 'queued') {
+                    watchEmailStatus(result.coupon_code, email);
+                }
+                
             } catch (error) {
                 resultDiv.innerHTML = `
                     <div class="email-status email-error">
@@ -525,29 +584,250 @@ USER_TEMPLATE = """
 </html>
 """
 
+# USER_TEMPLATE has no template variables, so the page is encoded once
+# and served as-is with an ETag for conditional requests
+INDEX_BYTES = USER_TEMPLATE.encode('utf-8')
+INDEX_ETAG = hashlib.blake2b(INDEX_BYTES, digest_size=16).hexdigest()
+
+# Pre-compressed copies of the page, picked per request from Accept-Encoding
+INDEX_GZIP = gzip.compress(INDEX_BYTES, 9)
+INDEX_BROTLI = brotli.compress(INDEX_BYTES, quality=11) if brotli else None
+
+# Shortest body that can hold a non-empty story; anything smaller is
+# answered like an empty story without being read or parsed
+MIN_STORY_LENGTH = 10
+MIN_COUPON_BODY_BYTES = len('{"story":"x"}')
+
+# Load balancer health checks reuse one serialized body per second
+HEALTH_TTL = 1.0
+health_cache = {'built_at': 0.0, 'body': b''}
+
+# Coupon emails waiting to be sent, drained by email_worker
+email_queue = None
+email_worker_task = None
+
+# Email jobs and their delivery status are spooled to files here, so any
+# worker process can answer /email_status and jobs left by a worker that
+# died are picked up by the next one to start
+EMAIL_SPOOL_DIR = os.getenv("EMAIL_SPOOL_DIR", os.path.join(tempfile.gettempdir(), "pizza-email-spool"))
+EMAIL_STATUS_TTL = 24 * 3600  # Seconds a delivery status stays queryable
+
+# Status messages are generic: /email_status answers anyone holding the
+# coupon code, so it never echoes the recipient or SMTP details
+EMAIL_STATUS_MESSAGES = {
+    'queued': "Your coupon is on its way",
+    'sent': "Your coupon email has been delivered",
+    'failed': "Your coupon email could not be sent"
+}
+
+def jsonify(data):
+    """JSON response serialized with orjson"""
+    return Response(orjson.dumps(data), mimetype='application/json')
+
+async def get_request_json():
+    """Parse the request body with orjson, empty or malformed bodies give {}"""
+    body = await request.get_data()
+    try:
+        return orjson.loads(body) if body else {}
+    except orjson.JSONDecodeError:
+        return {}
+
+def fallback_response(rating):
+    """Static response message when AI responses are disabled"""
+    if rating >= 8:
+        return f"🎉 Amazing story! Your coupon gets you a LARGE premium pizza! 🏆"
+    elif rating >= 6:
+        return f"😊 Great story! Your coupon gets you a MEDIUM pizza! 👍"
+    else:
+        return f"🍕 Thanks for sharing! Your coupon gets you a tasty pizza! 🙂"
+
+def spool_path(coupon_code, suffix):
+    """Spool file for a coupon, named by digest so codes never form paths"""
+    key = hashlib.blake2b(coupon_code.encode(), digest_size=16).hexdigest()
+    return os.path.join(EMAIL_SPOOL_DIR, f"{key}{suffix}")
+
+def write_atomic(path, body):
+    """Write a file so readers in other workers never see it half-written"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(body)
+    os.replace(tmp_path, path)
+
+def set_email_status(coupon_code, status):
+    """Record the delivery status reported by /email_status"""
+    write_atomic(spool_path(coupon_code, '.status'), orjson.dumps({
+        'email_sent': status == 'sent',
+        'email_status': status,
+        'email_message': EMAIL_STATUS_MESSAGES[status]
+    }))
+
+def get_email_status(coupon_code):
+    """Delivery status written by any worker, or None if unknown"""
+    try:
+        with open(spool_path(coupon_code, '.status'), 'rb') as f:
+            return orjson.loads(f.read())
+    except (FileNotFoundError, orjson.JSONDecodeError):
+        return None
+
+def spool_email_job(job):
+    """Persist an email job owned by this process and mark it queued"""
+    os.makedirs(EMAIL_SPOOL_DIR, exist_ok=True)
+    set_email_status(job['coupon_code'], 'queued')
+    path = spool_path(job['coupon_code'], f".{os.getpid()}.job")
+    write_atomic(path, orjson.dumps(job))
+    return path
+
+def finish_email_job(path, coupon_code, status):
+    """Record the outcome of a job and drop it from the spool"""
+    try:
+        set_email_status(coupon_code, status)
+        os.remove(path)
+    except OSError as e:
+        print(f"📧 Could not update email spool for {coupon_code}: {e}")
+
+def pid_alive(pid):
+    """Whether a process with this pid still exists"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def recover_email_jobs():
+    """Claim spooled jobs whose worker has exited and prune expired statuses;
+    returns the claimed (path, job) pairs"""
+    os.makedirs(EMAIL_SPOOL_DIR, exist_ok=True)
+    recovered = []
+    now = time.time()
+    for name in os.listdir(EMAIL_SPOOL_DIR):
+        path = os.path.join(EMAIL_SPOOL_DIR, name)
+        if name.endswith('.status'):
+            try:
+                if now - os.path.getmtime(path) > EMAIL_STATUS_TTL:
+                    os.remove(path)
+            except OSError:
+                pass
+            continue
+        if not name.endswith('.job'):
+            continue
+        key, pid, _ = name.rsplit('.', 2)
+        if not pid.isdigit() or pid_alive(int(pid)):
+            continue
+        # The rename is atomic, so only one starting worker claims a job
+        claimed = os.path.join(EMAIL_SPOOL_DIR, f"{key}.{os.getpid()}.job")
+        try:
+            os.rename(path, claimed)
+        except OSError:
+            continue
+        try:
+            with open(claimed, 'rb') as f:
+                recovered.append((claimed, orjson.loads(f.read())))
+        except (OSError, orjson.JSONDecodeError) as e:
+            print(f"📧 Dropping unreadable email job {name}: {e}")
+            os.remove(claimed)
+    return recovered
+
+async def email_worker():
+    """Send queued coupon emails outside the request path"""
+    while True:
+        path, job = await email_queue.get()
+        coupon_code = job['coupon_code']
+        status = "failed"
+        try:
+            # SMTP is blocking, keep it off the event loop
+            email_result = await asyncio.to_thread(
+                send_coupon_email, job['email'], coupon_code, job['tier'], job['rating'], job['response']
+            )
+            status = "sent" if email_result['success'] else "failed"
+            print(f"📧 Email {status} for {coupon_code}: {email_result['message']}")
+        except Exception as e:
+            print(f"📧 Email failed for {coupon_code}: {e}")
+        finally:
+            await asyncio.to_thread(finish_email_job, path, coupon_code, status)
+            email_queue.task_done()
+
+def get_health_body():
+    """Serialized health status, rebuilt at most once per HEALTH_TTL"""
+    now = time.monotonic()
+    if now - health_cache['built_at'] >= HEALTH_TTL:
+        health_cache['body'] = orjson.dumps({
+            'status': 'healthy',
+            'gemini': get_gemini_status()['status'],
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+        })
+        health_cache['built_at'] = now
+    return health_cache['body']
+
+@app.before_serving
+async def start_email_worker():
+    """Start the background email worker"""
+    global email_queue, email_worker_task
+    email_queue = asyncio.Queue()
+    try:
+        for path, job in await asyncio.to_thread(recover_email_jobs):
+            email_queue.put_nowait((path, job))
+    except OSError as e:
+        print(f"📧 Could not read email spool {EMAIL_SPOOL_DIR}: {e}")
+    email_worker_task = asyncio.create_task(email_worker())
+
+@app.after_serving
+async def stop_email_worker():
+    """Let queued emails go out, then stop the worker"""
+    await email_queue.join()
+    email_worker_task.cancel()
+
 @app.route('/')
-def index():
+async def index():
     """Main user interface"""
-    return render_template_string(USER_TEMPLATE)
+    accept_encoding = request.headers.get('Accept-Encoding', '')
+    body, encoding = INDEX_BYTES, None
+    if INDEX_BROTLI and 'br' in accept_encoding:
+        body, encoding = INDEX_BROTLI, 'br'
+    elif 'gzip' in accept_encoding:
+        body, encoding = INDEX_GZIP, 'gzip'
+    
+    # Strong validators must differ when the bytes do, so each encoding
+    # of the page has its own ETag
+    etag = f'{INDEX_ETAG}-{encoding}' if encoding else INDEX_ETAG
+    headers = {
+        'ETag': f'"{etag}"',
+        'Cache-Control': 'public, max-age=300',
+        'Vary': 'Accept-Encoding'
+    }
+    if request.if_none_match.contains(etag):
+        return Response(b'', status=304, headers=headers)
+    if encoding:
+        headers['Content-Encoding'] = encoding
+    return Response(body, mimetype='text/html', headers=headers)
+
+@app.route('/health')
+async def health():
+    """Health check for load balancers"""
+    return Response(get_health_body(), mimetype='application/json')
 
 @app.route('/generate_coupon', methods=['POST'])
-def generate_coupon():
+async def generate_coupon():
     """Generate a coupon without email"""
-    data = request.json
+    # Reject bodies too small to hold a story before reading or parsing them
+    content_length = request.content_length
+    if content_length is not None and content_length < MIN_COUPON_BODY_BYTES:
+        return jsonify({'error': 'Story is required'})
+    
+    data = await get_request_json()
     story = data.get('story', '').strip()
     
     if not story:
         return jsonify({'error': 'Story is required'})
     
-    if len(story) < 10:
+    if len(story) < MIN_STORY_LENGTH:
         return jsonify({'error': 'Please write a longer story (at least 10 characters)'})
     
     try:
         # Evaluate story
         if USE_AI_EVALUATION and USE_GEMINI:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            rating, explanation = loop.run_until_complete(gemini_evaluate_story(story))
+            rating, explanation = await gemini_evaluate_story(story)
         else:
             rating = evaluate_story_quality(story)
             explanation = "Rule-based evaluation"
@@ -557,19 +837,9 @@ def generate_coupon():
         
         # Generate response
         if USE_AI_RESPONSES and USE_GEMINI:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            response = loop.run_until_complete(
-                gemini_generate_response_message(story, rating, tier, coupon_code)
-            )
+            response = await gemini_generate_response_message(story, rating, tier, coupon_code)
         else:
-            # Fallback response
-            if rating >= 8:
-                response = f"🎉 Amazing story! Your coupon gets you a LARGE premium pizza! 🏆"
-            elif rating >= 6:
-                response = f"😊 Great story! Your coupon gets you a MEDIUM pizza! 👍"
-            else:
-                response = f"🍕 Thanks for sharing! Your coupon gets you a tasty pizza! 🙂"
+            response = fallback_response(rating)
         
         return jsonify({
             'coupon_code': coupon_code,
@@ -584,9 +854,14 @@ def generate_coupon():
         })
 
 @app.route('/generate_coupon_with_email', methods=['POST'])
-def generate_coupon_with_email():
+async def generate_coupon_with_email():
     """Generate a coupon and send via email"""
-    data = request.json
+    # Reject bodies too small to hold a story before reading or parsing them
+    content_length = request.content_length
+    if content_length is not None and content_length < MIN_COUPON_BODY_BYTES:
+        return jsonify({'error': 'Story is required'})
+    
+    data = await get_request_json()
     story = data.get('story', '').strip()
     email = data.get('email', '').strip()
     
@@ -596,7 +871,7 @@ def generate_coupon_with_email():
     if not email:
         return jsonify({'error': 'Email address is required'})
     
-    if len(story) < 10:
+    if len(story) < MIN_STORY_LENGTH:
         return jsonify({'error': 'Please write a longer story (at least 10 characters)'})
     
     if not validate_email(email):
@@ -605,9 +880,7 @@ def generate_coupon_with_email():
     try:
         # Evaluate story
         if USE_AI_EVALUATION and USE_GEMINI:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            rating, explanation = loop.run_until_complete(gemini_evaluate_story(story))
+            rating, explanation = await gemini_evaluate_story(story)
         else:
             rating = evaluate_story_quality(story)
             explanation = "Rule-based evaluation"
@@ -617,30 +890,31 @@ def generate_coupon_with_email():
         
         # Generate response
         if USE_AI_RESPONSES and USE_GEMINI:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            response = loop.run_until_complete(
-                gemini_generate_response_message(story, rating, tier, coupon_code)
-            )
+            response = await gemini_generate_response_message(story, rating, tier, coupon_code)
         else:
-            # Fallback response
-            if rating >= 8:
-                response = f"🎉 Amazing story! Your coupon gets you a LARGE premium pizza! 🏆"
-            elif rating >= 6:
-                response = f"😊 Great story! Your coupon gets you a MEDIUM pizza! 👍"
-            else:
-                response = f"🍕 Thanks for sharing! Your coupon gets you a tasty pizza! 🙂"
+            response = fallback_response(rating)
         
-        # Send email
-        email_result = send_coupon_email(email, coupon_code, tier, rating, response)
+        # The SMTP send happens in the email worker; the job is spooled first
+        # so it survives a worker restart, and /email_status reports its outcome
+        job = {
+            'email': email,
+            'coupon_code': coupon_code,
+            'tier': tier,
+            'rating': rating,
+            'response': response
+        }
+        path = await asyncio.to_thread(spool_email_job, job)
+        await email_queue.put((path, job))
+        email_message = f"Your coupon is on its way to {email}"
         
         return jsonify({
             'coupon_code': coupon_code,
             'tier': tier,
             'rating': rating,
             'response': response,
-            'email_sent': email_result['success'],
-            'email_message': email_result['message']
+            'email_sent': False,
+            'email_status': 'queued',
+            'email_message': email_message
         })
         
     except Exception as e:
@@ -648,9 +922,18 @@ def generate_coupon_with_email():
             'error': f"Sorry, something went wrong: {str(e)}"
         })
 
+@app.route('/email_status/<coupon_code>')
+async def email_status(coupon_code):
+    """Delivery status of a queued coupon email: queued, sent or failed"""
+    status = await asyncio.to_thread(get_email_status, coupon_code)
+    if status is None:
+        return jsonify({'error': 'Unknown coupon code'}), 404
+    return jsonify(status)
+
 if __name__ == '__main__':
     print("🍕 Starting Pizza Intelligence")
     print("📱 Open your browser to: http://127.0.0.1:5002")
     print("🎯 Clean user interface - ready for production!")
+    print("🚀 Production: gunicorn -c gunicorn_conf.py pizza_coupon_app:app")
     print()
     app.run(debug=True, host='127.0.0.1', port=5002)
\ No newline at end of file
@@ -6,19 +6,46 @@ Includes testing, monitoring, and vendor tools
 
 import json
 import csv
+from collections import Counter
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 import hashlib
+import heapq
 import re
+import asyncio
+import atexit
+import time
 from functions import validate_coupon_format, extract_coupon_info
 from config import CONFERENCE_ID, COUPON_TIERS
 
+# Analytics writes are coalesced: the file is rewritten once per batch
+# of events or once the oldest unsaved event is this old (a timer on the
+# caller's event loop enforces the deadline even when no more events come)
+ANALYTICS_FLUSH_EVENTS = 25
+ANALYTICS_FLUSH_SECONDS = 1.0
+
+# Keywords for the event summary's theme detection (simple substring match)
+PIZZA_THEMES = {
+    "late_night": ("3am", "late night", "all night", "midnight", "2am", "4am"),
+    "hackathon": ("hackathon", "coding", "debugging", "project", "team", "competition"),
+    "social": ("friends", "team", "together", "sharing", "group"),
+    "comfort": ("comfort", "stress", "tired", "energy", "fuel", "boost"),
+    "quality": ("amazing", "incredible", "perfect", "delicious", "best", "awesome")
+}
+
+# Display names for the themes, e.g. "late_night" -> "Late Night"
+THEME_LABELS = {theme: theme.replace("_", " ").title() for theme in PIZZA_THEMES}
+
 class PizzaAgentAnalytics:
     """Analytics tracker for the pizza agent"""
     
     def __init__(self, analytics_file: str = "pizza_analytics.json"):
         self.analytics_file = analytics_file
         self.data = self.load_analytics()
+        self.pending_events = 0
+        self.first_pending_at = 0.0
+        self.flush_handle = None
+        self.flush_registered = False
         # Store actual stories for summary generation
         if "stories" not in self.data:
             self.data["stories"] = []
@@ -49,6 +76,40 @@ class PizzaAgentAnalytics:
         except Exception as e:
             print(f"Error saving analytics: {e}")
     
+    def mark_dirty(self):
+        """Record an unsaved event and save once the batch is full or old enough"""
+        if not self.flush_registered:
+            # Read-only instances never need a final flush
+            atexit.register(self.flush)
+            self.flush_registered = True
+        if not self.pending_events:
+            self.first_pending_at = time.monotonic()
+            self.schedule_flush()
+        self.pending_events += 1
+        if (self.pending_events >= ANALYTICS_FLUSH_EVENTS
+                or time.monotonic() - self.first_pending_at >= ANALYTICS_FLUSH_SECONDS):
+            self.flush()
+    
+    def schedule_flush(self):
+        """Flush ANALYTICS_FLUSH_SECONDS from now even if no other event arrives;
+        the timer runs on the caller's loop, so saves never interleave with updates"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Synchronous callers are short scripts: the batch and age checks
+            # in mark_dirty and the atexit flush cover them
+            return
+        self.flush_handle = loop.call_later(ANALYTICS_FLUSH_SECONDS, self.flush)
+    
+    def flush(self):
+        """Write any unsaved events to file"""
+        if self.flush_handle:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+        if self.pending_events:
+            self.pending_events = 0
+            self.save_analytics()
+    
     def record_request(self, user_id: str):
         """Record a new request from user"""
         self.data["total_requests"] += 1
@@ -61,13 +122,14 @@ class PizzaAgentAnalytics:
         user_hash = hashlib.sha256(user_id.encode()).hexdigest()[:8]
         self.data["user_interactions"][user_hash] = self.data["user_interactions"].get(user_hash, 0) + 1
         
-        self.save_analytics()
+        self.mark_dirty()
     
     def record_coupon_issued(self, user_id: str, tier: str, story_rating: int, story_length: int, user_email: str = "", story_text: str = ""):
         """Record a coupon being issued"""
         self.data["total_coupons_issued"] += 1
         self.data["coupons_by_tier"][tier] += 1
         self.data["story_ratings"].append(story_rating)
+        user_hash = hashlib.sha256(user_id.encode()).hexdigest()[:8]
         
         # Store the actual story for summary generation
         if story_text:
@@ -76,7 +138,7 @@ class PizzaAgentAnalytics:
                 "rating": story_rating,
                 "tier": tier,
                 "timestamp": datetime.now().isoformat(),
-                "user_hash": hashlib.sha256(user_id.encode()).hexdigest()[:8],
+                "user_hash": user_hash,
                 "story_length": story_length
             }
             self.data["stories"].append(story_entry)
@@ -90,7 +152,6 @@ class PizzaAgentAnalytics:
         if user_email:
             if "user_emails" not in self.data:
                 self.data["user_emails"] = {}
-            user_hash = hashlib.sha256(user_id.encode()).hexdigest()[:8]
             # Store full email address and domain for analytics
             email_domain = user_email.split('@')[1] if '@' in user_email else "unknown"
             self.data["user_emails"][user_hash] = {
@@ -101,7 +162,7 @@ class PizzaAgentAnalytics:
                 "timestamp": datetime.now().isoformat()
             }
         
-        self.save_analytics()
+        self.mark_dirty()
     
     def get_summary_stats(self) -> dict:
         """Get summary statistics"""
@@ -114,7 +175,7 @@ class PizzaAgentAnalytics:
             "average_story_rating": sum(story_ratings) / len(story_ratings) if story_ratings else 0,
             "average_story_length": self.data["average_story_length"],
             "unique_users": len(self.data["user_interactions"]),
-            "top_hours": sorted(self.data["hourly_stats"].items(), key=lambda x: x[1], reverse=True)[:5]
+            "top_hours": heapq.nlargest(5, self.data["hourly_stats"].items(), key=lambda x: x[1])
         }
     
     def generate_event_summary(self) -> dict:
@@ -128,31 +189,34 @@ class PizzaAgentAnalytics:
                 "stats": self.get_summary_stats()
             }
         
-        # Analyze story themes and patterns
-        high_rated_stories = [s for s in stories if s["rating"] >= 8]
-        medium_rated_stories = [s for s in stories if 5 <= s["rating"] < 8]
-        low_rated_stories = [s for s in stories if s["rating"] < 5]
+        # Analyze story themes and patterns (one pass buckets the ratings)
+        high_rated_stories = []
+        medium_rated_stories = []
+        low_rated_stories = []
+        rating_total = 0
+        for s in stories:
+            rating = s["rating"]
+            rating_total += rating
+            if rating >= 8:
+                high_rated_stories.append(s)
+            elif rating >= 5:
+                medium_rated_stories.append(s)
+            else:
+                low_rated_stories.append(s)
         
         # Generate insights
         total_stories = len(stories)
-        avg_rating = sum(s["rating"] for s in stories) / total_stories
+        avg_rating = rating_total / total_stories
         
         # Common themes analysis (simple keyword detection)
         all_story_text = " ".join([s["story"].lower() for s in stories])
         
-        pizza_themes = {
-            "late_night": ["3am", "late night", "all night", "midnight", "2am", "4am"],
-            "hackathon": ["hackathon", "coding", "debugging", "project", "team", "competition"],
-            "social": ["friends", "team", "together", "sharing", "group"],
-            "comfort": ["comfort", "stress", "tired", "energy", "fuel", "boost"],
-            "quality": ["amazing", "incredible", "perfect", "delicious", "best", "awesome"]
-        }
-        
-        theme_counts = {}
-        for theme, keywords in pizza_themes.items():
-            count = sum(1 for keyword in keywords if keyword in all_story_text)
-            if count > 0:
-                theme_counts[theme] = count
+        theme_counter = Counter({
+            theme: sum(keyword in all_story_text for keyword in keywords)
+            for theme, keywords in PIZZA_THEMES.items()
+        })
+        # Most mentioned first; themes with no matches are left out
+        theme_counts = {theme: count for theme, count in theme_counter.most_common() if count > 0}
         
         # Generate recommendations based on analysis
         recommendations = []
@@ -197,9 +261,8 @@ class PizzaAgentAnalytics:
         ]
         
         if theme_counts:
-            for theme, count in sorted(theme_counts.items(), key=lambda x: x[1], reverse=True):
-                theme_name = theme.replace("_", " ").title()
-                summary_parts.append(f"• {theme_name}: Mentioned {count} times")
+            for theme, count in theme_counts.items():
+                summary_parts.append(f"• {THEME_LABELS[theme]}: Mentioned {count} times")
         else:
             summary_parts.append("• No clear themes identified yet")
         
@@ -296,10 +359,7 @@ class VendorTools:
     def get_redemption_stats(self) -> dict:
         """Get redemption statistics for vendors"""
         total_redeemed = len(self.redemption_log)
-        tier_counts = {}
-        for redemption in self.redemption_log:
-            tier = redemption["tier"]
-            tier_counts[tier] = tier_counts.get(tier, 0) + 1
+        tier_counts = dict(Counter(redemption["tier"] for redemption in self.redemption_log))
         
         return {
             "total_redeemed": total_redeemed,
@@ -4,17 +4,28 @@ Simple web interface to test Pizza Agent functionality
 This bypasses the uAgents framework and tests the core functions directly
 """
 
-from flask import Flask, render_template_string, request, jsonify
+from quart import Quart, Response, render_template, request
 import asyncio
+import gzip
+import hashlib
+import orjson
+import os
+import random
+from datetime import datetime
 from functions import generate_coupon_code, evaluate_story_quality
 from ai_functions import ai_evaluate_story, ai_generate_personalized_response, ai_generate_dynamic_prompts
 from gemini_functions import gemini_evaluate_story, gemini_generate_response_message, gemini_generate_unique_prompt
 from config import USE_GEMINI, USE_AI_EVALUATION, USE_AI_RESPONSES, USE_AI_PROMPTS
-from email_utils import send_coupon_email, test_email_configuration, validate_email
+from email_utils import send_coupon_email, get_email_configuration_status, validate_email
 from user_config import get_user_email, get_test_config
-import json
+from utils import PizzaAgentAnalytics, THEME_LABELS
 
-app = Flask(__name__)
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+app = Quart(__name__)
 
 # Admin dashboard template
 ADMIN_TEMPLATE = """
@@ -175,11 +186,13 @@ ADMIN_TEMPLATE = """
             border-radius: 10px;
             z-index: 1000;
             opacity: 0;
-            transition: opacity 0.3s;
+            transform: translateY(-100%);
+            transition: transform 0.3s, opacity 0.3s;
+            will-change: transform, opacity;
             box-shadow: 0 4px 15px rgba(0,184,148,0.3);
         }
         
-        .toast.show { opacity: 1; }
+        .toast.show { opacity: 1; transform: translateY(0); }
         
         .toast.error {
             background: linear-gradient(135deg, #e17055 0%, #d63031 100%);
@@ -338,10 +351,18 @@ ADMIN_TEMPLATE = """
             toast.textContent = message;
             document.body.appendChild(toast);
             
-            setTimeout(() => toast.classList.add('show'), 100);
+            // Two frames: the first commits the hidden state, the second
+            // flips the class so the fade runs without a forced reflow
+            requestAnimationFrame(() => requestAnimationFrame(() => toast.classList.add('show')));
             setTimeout(() => {
-                toast.classList.remove('show');
-                setTimeout(() => document.body.removeChild(toast), 300);
+                requestAnimationFrame(() => {
+                    // Removed once the fade-out transition has actually finished
+                    toast.addEventListener('transitionend', () => toast.remove(), { once: true });
+                    toast.classList.remove('show');
+                });
+                // ...or shortly after, when no transition runs at all (never
+                // shown, reduced motion, frames paused in a background tab)
+                setTimeout(() => toast.remove(), 400);
             }, 3000);
         }
         
@@ -381,97 +402,19 @@ ADMIN_TEMPLATE = """
             button.disabled = true;
             
             try {
-                const response = await fetch('/admin_summary', {
+                // The server renders (and escapes) the result fragment
+                const response = await fetch('/admin_summary_html', {
                     method: 'POST',
                     headers: {'Content-Type': 'application/json'},
                     body: JSON.stringify({admin_confirmed: true})
                 });
                 
-                const result = await response.json();
+                document.getElementById('adminSummaryResult').innerHTML = await response.text();
                 
-                if (result.success) {
-                    const summary = result.summary;
-                    
-                    document.getElementById('adminSummaryResult').innerHTML = 
-                        `<div class="container">
-                            <div class="section-header">
-                                <h2>📋 Executive Summary</h2>
-                            </div>
-                            <div class="executive-summary">
-                                ${summary.summary}
-                            </div>
-                            
-                            <div class="section-header">
-                                <h2>📊 Key Performance Indicators</h2>
-                            </div>
-                            <div class="summary-grid">
-                                <div class="metric-card">
-                                    <div class="metric-value">${summary.stats.total_coupons_issued}</div>
-                                    <div class="metric-label">Total Coupons Issued</div>
-                                </div>
-                                <div class="metric-card">
-                                    <div class="metric-value">${summary.stats.average_story_rating.toFixed(1)}/10</div>
-                                    <div class="metric-label">Average Story Rating</div>
-                                </div>
-                                <div class="metric-card">
-                                    <div class="metric-value">${summary.stats.unique_users}</div>
-                                    <div class="metric-label">Unique Participants</div>
-                                </div>
-                                <div class="metric-card">
-                                    <div class="metric-value">${(summary.stats.conversion_rate * 100).toFixed(1)}%</div>
-                                    <div class="metric-label">Conversion Rate</div>
-                                </div>
-                                <div class="metric-card">
-                                    <div class="metric-value">${summary.stats.total_requests}</div>
-                                    <div class="metric-label">Total Requests</div>
-                                </div>
-                                <div class="metric-card">
-                                    <div class="metric-value">${Math.round(summary.stats.average_story_length)}</div>
-                                    <div class="metric-label">Avg Story Length</div>
-                                </div>
-                            </div>
-                            
-                            <div class="section-header">
-                                <h2>💡 Strategic Recommendations</h2>
-                            </div>
-                            <div class="recommendations-list">
-                                <h5>Actionable Insights for Future Events:</h5>
-                                <ul>
-                                    ${summary.recommendations.map(rec => '<li>' + rec + '</li>').join('')}
-                                </ul>
-                            </div>
-                            
-                            ${summary.theme_analysis && Object.keys(summary.theme_analysis).length > 0 ? `
-                            <div class="section-header">
-                                <h2>🎭 Participant Engagement Themes</h2>
-                            </div>
-                            <div class="theme-grid">
-                                ${Object.entries(summary.theme_analysis).map(([theme, count]) => 
-                                    '<div class="theme-card">' +
-                                        '<div style="font-size: 1.5em; font-weight: bold;">' + theme.replace('_', ' ').toUpperCase() + '</div>' +
-                                        '<div style="font-size: 1.2em; margin-top: 8px;">' + count + ' mentions</div>' +
-                                    '</div>'
-                                ).join('')}
-                            </div>
-                            ` : ''}
-                            
-                            <div class="footer-info">
-                                <p><strong>📅 Report Generated:</strong> ${new Date().toLocaleString()}</p>
-                                <p><strong>🔒 Confidential:</strong> Admin-only access • Event organizer use only</p>
-                                <p><strong>📊 Data Source:</strong> Pizza Agent Analytics System</p>
-                            </div>
-                        </div>`;
-                    
+                if (response.ok) {
                     showToast('Event analysis generated successfully!');
                 } else {
-                    document.getElementById('adminSummaryResult').innerHTML = 
-                        `<div class="container">
-                            <div class="error">
-                                <h3>❌ Access Denied</h3>
-                                <p>${result.message}</p>
-                            </div>
-                        </div>`;
-                    showToast('Access denied', 'error');
+                    showToast(response.status === 403 ? 'Access denied' : 'Failed to generate analysis', 'error');
                 }
                 
             } catch (error) {
@@ -493,12 +436,91 @@ ADMIN_TEMPLATE = """
 </html>
 """
 
+# Admin summary result, rendered server-side with autoescaping so story
+# text in the summary cannot inject markup into the dashboard
+ADMIN_RESULT_HTML = """
+<div class="container">
+    {% if error %}
+    <div class="error">
+        <h3>❌ {{ error_title }}</h3>
+        <p>{{ error }}</p>
+    </div>
+    {% else %}
+    <div class="section-header">
+        <h2>📋 Executive Summary</h2>
+    </div>
+    <div class="executive-summary">{{ summary.summary }}</div>
+    
+    <div class="section-header">
+        <h2>📊 Key Performance Indicators</h2>
+    </div>
+    <div class="summary-grid">
+        <div class="metric-card">
+            <div class="metric-value">{{ summary.stats.total_coupons_issued }}</div>
+            <div class="metric-label">Total Coupons Issued</div>
+        </div>
+        <div class="metric-card">
+            <div class="metric-value">{{ '%.1f' % summary.stats.average_story_rating }}/10</div>
+            <div class="metric-label">Average Story Rating</div>
+        </div>
+        <div class="metric-card">
+            <div class="metric-value">{{ summary.stats.unique_users }}</div>
+            <div class="metric-label">Unique Participants</div>
+        </div>
+        <div class="metric-card">
+            <div class="metric-value">{{ '%.1f' % (summary.stats.conversion_rate * 100) }}%</div>
+            <div class="metric-label">Conversion Rate</div>
+        </div>
+        <div class="metric-card">
+            <div class="metric-value">{{ summary.stats.total_requests }}</div>
+            <div class="metric-label">Total Requests</div>
+        </div>
+        <div class="metric-card">
+            <div class="metric-value">{{ summary.stats.average_story_length | round | int }}</div>
+            <div class="metric-label">Avg Story Length</div>
+        </div>
+    </div>
+    
+    <div class="section-header">
+        <h2>💡 Strategic Recommendations</h2>
+    </div>
+    <div class="recommendations-list">
+        <h5>Actionable Insights for Future Events:</h5>
+        <ul>
+            {% for rec in summary.recommendations %}<li>{{ rec }}</li>{% endfor %}
+        </ul>
+    </div>
+    
+    {% if summary.theme_analysis %}
+    <div class="section-header">
+        <h2>🎭 Participant Engagement Themes</h2>
+    </div>
+    <div class="theme-grid">
+        {% for theme, count in summary.theme_analysis.items() %}
+        <div class="theme-card">
+            <div style="font-size: 1.5em; font-weight: bold;">{{ theme_labels[theme] }}</div>
+            <div style="font-size: 1.2em; margin-top: 8px;">{{ count }} mentions</div>
+        </div>
+        {% endfor %}
+    </div>
+    {% endif %}
+    
+    <div class="footer-info">
+        <p><strong>📅 Report Generated:</strong> {{ generated_at }}</p>
+        <p><strong>🔒 Confidential:</strong> Admin-only access • Event organizer use only</p>
+        <p><strong>📊 Data Source:</strong> Pizza Agent Analytics System</p>
+    </div>
+    {% endif %}
+</div>
+"""
+
 # HTML template for the web interface
 HTML_TEMPLATE = """
 <!DOCTYPE html>
 <html>
 <head>
     <title>🍕 Pizza Agent Test Interface</title>
+    <link rel="preconnect" href="https://cdn.jsdelivr.net">
     <style>
         body { font-family: Arial, sans-serif; max-width: 900px; margin: 0 auto; padding: 20px; background: #f8f9fa; }
         .container { background: #ffffff; padding: 25px; border-radius: 12px; margin: 15px 0; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }
@@ -508,6 +530,10 @@ HTML_TEMPLATE = """
         
         textarea { width: 100%; height: 120px; padding: 12px; border-radius: 8px; border: 2px solid #ddd; font-family: inherit; resize: vertical; }
         textarea:focus { border-color: #4CAF50; outline: none; }
+        /* Browsers that can size a field to its content grow the story box natively */
+        @supports (field-sizing: content) {
+            textarea#story { field-sizing: content; height: auto; min-height: 120px; max-height: 60vh; }
+        }
         
         button { background: #4CAF50; color: white; padding: 12px 24px; border: none; border-radius: 8px; cursor: pointer; margin: 8px 5px; font-size: 14px; font-weight: 500; transition: all 0.3s; }
         button:hover { background: #45a049; transform: translateY(-1px); }
@@ -658,9 +684,12 @@ HTML_TEMPLATE = """
             border-radius: 8px;
             z-index: 1000;
             opacity: 0;
-            transition: opacity 0.3s;
+            transform: translateY(-100%);
+            transition: transform 0.3s, opacity 0.3s;
+            will-change: transform, opacity;
         }
-        .toast.show { opacity: 1; }
+        .toast.show { opacity: 1; transform: translateY(0); }
+        .toast.error { background: #f44336; margin: 0; border-left: none; }
         
         .admin-section {
             border: 2px solid #ffc107;
@@ -790,7 +819,6 @@ HTML_TEMPLATE = """
         </div>
     </div>
 
-    <script src="https://cdn.jsdelivr.net/npm/marked/marked.min.js"></script>
     <script>
         // Toast notification function
         function showToast(message, type = 'success') {
@@ -799,10 +827,18 @@ HTML_TEMPLATE = """
             toast.textContent = message;
             document.body.appendChild(toast);
             
-            setTimeout(() => toast.classList.add('show'), 100);
+            // Two frames: the first commits the hidden state, the second
+            // flips the class so the fade runs without a forced reflow
+            requestAnimationFrame(() => requestAnimationFrame(() => toast.classList.add('show')));
             setTimeout(() => {
-                toast.classList.remove('show');
-                setTimeout(() => document.body.removeChild(toast), 300);
+                requestAnimationFrame(() => {
+                    // Removed once the fade-out transition has actually finished
+                    toast.addEventListener('transitionend', () => toast.remove(), { once: true });
+                    toast.classList.remove('show');
+                });
+                // ...or shortly after, when no transition runs at all (never
+                // shown, reduced motion, frames paused in a background tab)
+                setTimeout(() => toast.remove(), 400);
             }, 3000);
         }
         
@@ -810,27 +846,89 @@ HTML_TEMPLATE = """
         function copyToClipboard(text, buttonElement) {
             navigator.clipboard.writeText(text).then(() => {
                 const originalText = buttonElement.textContent;
+                const originalClass = buttonElement.className;
+                // Visual state is switched with one class write each way
+                buttonElement.className = `${originalClass} copied`;
                 buttonElement.textContent = '✅ Copied!';
-                buttonElement.classList.add('copied');
                 showToast('Coupon code copied to clipboard!');
                 
-                setTimeout(() => {
+                setTimeout(() => requestAnimationFrame(() => {
+                    buttonElement.className = originalClass;
                     buttonElement.textContent = originalText;
-                    buttonElement.classList.remove('copied');
-                }, 2000);
+                }), 2000);
             }).catch(() => {
                 showToast('Failed to copy to clipboard', 'error');
             });
         }
         
+        // Markdown is parsed by marked inside a Web Worker so long agent
+        // responses never block the page while they are converted
+        const markdownWorkerSource = `
+            importScripts('https://cdn.jsdelivr.net/npm/marked/marked.min.js');
+            // Configure marked for better rendering, once for the worker's lifetime
+            const markdown = new marked.Marked({ breaks: true, gfm: true });
+            self.onmessage = (event) => {
+                self.postMessage({ id: event.data.id, html: markdown.parse(event.data.text) });
+            };
+        `;
+        let markdownWorker = null;
+        const pendingMarkdown = new Map();
+        let nextMarkdownId = 0;
+        
+        // Rendered HTML by markdown source, so repeated text skips the worker
+        const markdownCache = new Map();
+        const MARKDOWN_CACHE_SIZE = 200;
+        
+        // The worker (and with it marked) is only loaded on the first render,
+        // so the page paints without fetching a script nothing needs yet
+        function getMarkdownWorker() {
+            if (markdownWorker) {
+                return markdownWorker;
+            }
+            markdownWorker = new Worker(URL.createObjectURL(
+                new Blob([markdownWorkerSource], { type: 'text/javascript' })
+            ));
+            
+            markdownWorker.onmessage = (event) => {
+                const { resolve, text } = pendingMarkdown.get(event.data.id);
+                pendingMarkdown.delete(event.data.id);
+                if (markdownCache.size >= MARKDOWN_CACHE_SIZE) {
+                    markdownCache.clear();
+                }
+                markdownCache.set(text, event.data.html);
+                resolve(event.data.html);
+            };
+            
+            // If marked cannot be loaded, fall back to showing the raw text and
+            // drop the broken worker so the next render starts a fresh one
+            markdownWorker.onerror = () => {
+                markdownWorker.terminate();
+                markdownWorker = null;
+                pendingMarkdown.forEach(({ resolve, text }) => resolve(text));
+                pendingMarkdown.clear();
+            };
+            return markdownWorker;
+        }
+        
         // Markdown rendering function
-        function renderMarkdown(text) {
-            // Configure marked for better rendering
-            marked.setOptions({
-                breaks: true,
-                gfm: true
+        function renderMarkdownAsync(text) {
+            const cached = markdownCache.get(text);
+            if (cached !== undefined) {
+                return Promise.resolve(cached);
+            }
+            return new Promise((resolve) => {
+                const id = nextMarkdownId++;
+                pendingMarkdown.set(id, { resolve, text });
+                getMarkdownWorker().postMessage({ id, text });
             });
-            return marked.parse(text);
+        }
+        
+        // Swap new markup into a result container in one step: the HTML is
+        // parsed into an off-document fragment, then replaces the old children
+        function showResult(targetId, html) {
+            const template = document.createElement('template');
+            template.innerHTML = html;
+            document.getElementById(targetId).replaceChildren(template.content);
         }
         
         // Format rating display
@@ -859,7 +957,7 @@ HTML_TEMPLATE = """
                 });
                 const result = await response.json();
                 
-                document.getElementById('storyResult').innerHTML = 
+                showResult('storyResult',
                     `<div class="response">
                         <h4>📊 Story Evaluation Result</h4>
                         <p><strong>Rating:</strong> ${formatRating(result.rating)}</p>
@@ -872,7 +970,7 @@ HTML_TEMPLATE = """
                             <p style="margin: 5px 0;"><strong>💡 Want a coupon?</strong></p>
                             <p style="margin: 5px 0;">Click "Generate Full Coupon Response" above to get your pizza coupon with redemption instructions!</p>
                         </div>
-                    </div>`;
+                    </div>`);
             } finally {
                 button.textContent = originalText;
                 button.disabled = false;
@@ -893,14 +991,15 @@ HTML_TEMPLATE = """
                     body: JSON.stringify({story: story})
                 });
                 const result = await response.json();
+                const responseHtml = await renderMarkdownAsync(result.response);
                 
-                document.getElementById('storyResult').innerHTML = 
+                showResult('storyResult',
                     `<div class="response">
                         <h4>🎫 Complete Coupon Response</h4>
                         
                         <div class="coupon-code">
                             ${result.coupon_code}
-                            <button class="copy-button" onclick="copyToClipboard('${result.coupon_code}', this)">
+                            <button class="copy-button" data-code="${result.coupon_code}">
                                 📋 Copy Code
                             </button>
                         </div>
@@ -927,20 +1026,22 @@ HTML_TEMPLATE = """
                         <div class="email-section">
                             <h5>📧 Email Coupon Option</h5>
                             <p>Want to receive this coupon via email? Enter your email address:</p>
-                            <input type="email" class="email-input" id="emailInput-${Date.now()}" placeholder="your.email@example.com" value="{{ default_email }}">
+                            <input type="email" class="email-input" placeholder="your.email@example.com" value="{{ default_email }}">
                             <div class="email-buttons">
-                                <button class="secondary" onclick="sendCouponEmail('${result.coupon_code}', '${result.tier}', ${result.rating}, '${result.response.replace(/'/g, \"\\\\'\").replace(/`/g, \"\\\\`\")}', this)">
+                                <button class="secondary send-email-button" data-code="${result.coupon_code}" data-tier="${result.tier}" data-rating="${result.rating}">
                                     📧 Send via Email
                                 </button>
                             </div>
-                            <div id="emailResult-${Date.now()}" class="email-status" style="display: none;"></div>
+                            <div class="email-status" style="display: none;"></div>
                         </div>
                         
                         <h5>🤖 Agent Response:</h5>
                         <div class="markdown-content" style="background: white; padding: 15px; border-radius: 8px; border-left: 4px solid #4CAF50;">
-                            ${renderMarkdown(result.response)}
+                            ${responseHtml}
                         </div>
-                    </div>`;
+                    </div>`);
+                // The raw response goes on the button as a property, so it needs no HTML escaping
+                document.querySelector('#storyResult .send-email-button').dataset.response = result.response;
             } finally {
                 button.textContent = originalText;
                 button.disabled = false;
@@ -968,15 +1069,16 @@ HTML_TEMPLATE = """
                     body: JSON.stringify({story: story, email: email})
                 });
                 const result = await response.json();
+                const responseHtml = await renderMarkdownAsync(result.response);
                 
                 if (result.email_sent) {
-                    document.getElementById('storyResult').innerHTML = 
+                    showResult('storyResult',
                         `<div class="response">
                             <h4>🎫 Coupon Generated & Emailed! 📧</h4>
                             
                             <div class="coupon-code">
                                 ${result.coupon_code}
-                                <button class="copy-button" onclick="copyToClipboard('${result.coupon_code}', this)">
+                                <button class="copy-button" data-code="${result.coupon_code}">
                                     📋 Copy Code
                                 </button>
                             </div>
@@ -992,18 +1094,18 @@ HTML_TEMPLATE = """
                             
                             <h5>🤖 Agent Response:</h5>
                             <div class="markdown-content" style="background: white; padding: 15px; border-radius: 8px; border-left: 4px solid #4CAF50;">
-                                ${renderMarkdown(result.response)}
+                                ${responseHtml}
                             </div>
-                        </div>`;
+                        </div>`);
                     showToast('Coupon sent to your email successfully!', 'success');
                 } else {
-                    document.getElementById('storyResult').innerHTML = 
+                    showResult('storyResult',
                         `<div class="response">
                             <h4>🎫 Coupon Generated (Email Failed) ⚠️</h4>
                             
                             <div class="coupon-code">
                                 ${result.coupon_code}
-                                <button class="copy-button" onclick="copyToClipboard('${result.coupon_code}', this)">
+                                <button class="copy-button" data-code="${result.coupon_code}">
                                     📋 Copy Code
                                 </button>
                             </div>
@@ -1020,9 +1122,9 @@ HTML_TEMPLATE = """
                             
                             <h5>🤖 Agent Response:</h5>
                             <div class="markdown-content" style="background: white; padding: 15px; border-radius: 8px; border-left: 4px solid #4CAF50;">
-                                ${renderMarkdown(result.response)}
+                                ${responseHtml}
                             </div>
-                        </div>`;
+                        </div>`);
                     showToast('Coupon generated but email failed to send', 'error');
                 }
             } finally {
@@ -1040,15 +1142,16 @@ HTML_TEMPLATE = """
             try {
                 const response = await fetch('/generate_prompt');
                 const result = await response.json();
+                const promptHtml = await renderMarkdownAsync(result.prompt);
                 
-                document.getElementById('promptResult').innerHTML = 
+                showResult('promptResult',
                     `<div class="response">
                         <h4>🎭 Generated Prompt</h4>
                         <div class="markdown-content" style="background: white; padding: 15px; border-radius: 8px;">
-                            ${renderMarkdown(result.prompt)}
+                            ${promptHtml}
                         </div>
                         <p><strong>Method:</strong> <code>${result.method}</code></p>
-                    </div>`;
+                    </div>`);
             } finally {
                 button.textContent = originalText;
                 button.disabled = false;
@@ -1061,30 +1164,66 @@ HTML_TEMPLATE = """
             button.innerHTML = '<span class="loading"></span> Testing...';
             button.disabled = true;
             
-            document.getElementById('workflowResult').innerHTML = '<p><span class="loading"></span> Testing full workflow...</p>';
+            showResult('workflowResult',
+                `<div class="response">
+                    <h4>🚀 Full Workflow Test</h4>
+                    <p class="workflow-loading"><span class="loading"></span> Testing full workflow...</p>
+                </div>`);
+            const container = document.querySelector('#workflowResult .response');
             
             try {
-                const response = await fetch('/test_workflow');
-                const result = await response.json();
-                
-                let html = '<div class="response"><h4>🚀 Full Workflow Test</h4>';
-                result.steps.forEach((step, index) => {
-                    html += `<div style="margin: 15px 0; padding: 15px; background: white; border-radius: 8px; border-left: 4px solid #2196F3;">
-                        <h5>Step ${index + 1}: ${step.name}</h5>
-                        <div class="markdown-content">
-                            ${renderMarkdown(step.result)}
-                        </div>
-                    </div>`;
+                // Steps arrive as Server-Sent Events and are shown as soon as each
+                // one is ready; rendering is chained so they stay in order
+                let rendering = Promise.resolve();
+                let stepCount = 0;
+                const completed = await new Promise((resolve) => {
+                    const source = new EventSource('/test_workflow');
+                    source.onmessage = (message) => {
+                        const step = JSON.parse(message.data);
+                        const index = stepCount++;
+                        rendering = rendering.then(() => appendWorkflowStep(container, step, index));
+                    };
+                    source.addEventListener('done', () => {
+                        source.close();
+                        resolve(true);
+                    });
+                    // A server error or dropped connection ends the stream before 'done'
+                    source.onerror = () => {
+                        source.close();
+                        resolve(false);
+                    };
                 });
-                html += '</div>';
-                
-                document.getElementById('workflowResult').innerHTML = html;
+                await rendering;
+                if (!completed) {
+                    await appendWorkflowStep(container, {
+                        name: 'Error',
+                        result: 'The workflow stream ended before all steps finished.'
+                    }, stepCount);
+                    showToast('Workflow test was interrupted', 'error');
+                }
+                container.querySelector('.workflow-loading').remove();
             } finally {
                 button.textContent = originalText;
                 button.disabled = false;
             }
         }
         
+        const EMAIL_REGEX = /^[^\s@]+@[^\s@]+\.[^\s@]+$/;
+        
+        // Append one workflow step above the loading indicator
+        async function appendWorkflowStep(container, step, index) {
+            const stepHtml = await renderMarkdownAsync(step.result);
+            const template = document.createElement('template');
+            template.innerHTML =
+                `<div style="margin: 15px 0; padding: 15px; background: white; border-radius: 8px; border-left: 4px solid #2196F3;">
+                    <h5>Step ${index + 1}: ${step.name}</h5>
+                    <div class="markdown-content">
+                        ${stepHtml}
+                    </div>
+                </div>`;
+            container.insertBefore(template.content, container.querySelector('.workflow-loading'));
+        }
+        
         // Send coupon via email
         async function sendCouponEmail(couponCode, tier, rating, response, buttonElement) {
             const emailInput = buttonElement.parentElement.parentElement.querySelector('.email-input');
@@ -1099,8 +1238,7 @@ HTML_TEMPLATE = """
             }
             
             // Basic email validation
-            const emailRegex = /^[^\s@]+@[^\s@]+\.[^\s@]+$/;
-            if (!emailRegex.test(email)) {
+            if (!EMAIL_REGEX.test(email)) {
                 emailResult.textContent = 'Please enter a valid email address';
                 emailResult.className = 'email-status error';
                 emailResult.style.display = 'block';
@@ -1170,13 +1308,36 @@ HTML_TEMPLATE = """
             }
         }
         
+        // One listener handles the copy and email buttons of every rendered coupon
+        document.addEventListener('click', (event) => {
+            const copyButton = event.target.closest('.copy-button');
+            if (copyButton) {
+                copyToClipboard(copyButton.dataset.code, copyButton);
+                return;
+            }
+            const emailButton = event.target.closest('.send-email-button');
+            if (emailButton) {
+                const { code, tier, rating, response } = emailButton.dataset;
+                sendCouponEmail(code, tier, Number(rating), response, emailButton);
+            }
+        });
+        
         // Auto-resize textarea and initialize page
         document.addEventListener('DOMContentLoaded', function() {
             const textarea = document.getElementById('story');
-            if (textarea) {
+            // Script fallback for browsers without CSS field-sizing
+            if (textarea && !CSS.supports('field-sizing', 'content')) {
+                // Resize at most once per frame, however fast input events arrive
+                let resizePending = false;
                 textarea.addEventListener('input', function() {
-                    this.style.height = 'auto';
-                    this.style.height = Math.max(120, this.scrollHeight) + 'px';
+                    if (resizePending) return;
+                    resizePending = true;
+                    requestAnimationFrame(() => {
+                        textarea.style.height = 'auto';
+                        const height = Math.max(120, textarea.scrollHeight);
+                        textarea.style.height = height + 'px';
+                        resizePending = false;
+                    });
                 });
             }
             
@@ -1188,30 +1349,155 @@ HTML_TEMPLATE = """
 </html>
 """
 
+def jsonify(data):
+    """JSON response serialized with orjson"""
+    return Response(orjson.dumps(data), mimetype='application/json')
+
+async def get_request_json():
+    """Parse the request body with orjson, empty or malformed bodies give {}"""
+    body = await request.get_data()
+    try:
+        return orjson.loads(body) if body else {}
+    except orjson.JSONDecodeError:
+        return {}
+
+def minify_html(html: str) -> str:
+    """Drop indentation and blank lines; line breaks are kept so inline
+    scripts still parse the same (no reliance on automatic semicolons)"""
+    return "\n".join(line.strip() for line in html.splitlines() if line.strip())
+
+# Upper-case theme card labels for the admin results, built once
+THEME_CARD_LABELS = {theme: label.upper() for theme, label in THEME_LABELS.items()}
+
+# Feature flags shown on the index page; module constants, so built once
+CONFIG_INFO = {
+    'USE_GEMINI': USE_GEMINI,
+    'USE_AI_EVALUATION': USE_AI_EVALUATION,
+    'USE_AI_RESPONSES': USE_AI_RESPONSES,
+    'USE_AI_PROMPTS': USE_AI_PROMPTS
+}
+
+# Parse the page template once at import instead of on every request;
+# the admin page has no template variables, so it is served as plain bytes
+INDEX_TEMPLATE = app.jinja_env.from_string(HTML_TEMPLATE)
+ADMIN_RESULT_TEMPLATE = app.jinja_env.from_string(minify_html(ADMIN_RESULT_HTML))
+ADMIN_BYTES = minify_html(ADMIN_TEMPLATE).encode('utf-8')
+
+def precompress(body: bytes) -> dict:
+    """Compressed copies of a static body, keyed by Content-Encoding"""
+    variants = {'gzip': gzip.compress(body, 9)}
+    if brotli:
+        variants['br'] = brotli.compress(body, quality=11)
+    return variants
+
+def body_etag(body: bytes) -> str:
+    """Strong validator for a response body"""
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+def encoded_etag(etag: str, encoding: str = None) -> str:
+    """Strong validators must differ when the bytes do, so each
+    Content-Encoding of a body gets its own suffixed ETag"""
+    return f'{etag}-{encoding}' if encoding else etag
+
+def static_page(body: bytes, variants: dict, etag: str, cache_control: str = 'public, max-age=300'):
+    """Serve a static page, picking a pre-compressed copy from Accept-Encoding;
+    a matching If-None-Match gets an empty 304"""
+    accept_encoding = request.headers.get('Accept-Encoding', '')
+    encoding = next(
+        (name for name in ('br', 'gzip') if name in variants and name in accept_encoding),
+        None
+    )
+    etag = encoded_etag(etag, encoding)
+    headers = {
+        'Cache-Control': cache_control,
+        'ETag': f'"{etag}"',
+        'Vary': 'Accept-Encoding'
+    }
+    if request.if_none_match.contains(etag):
+        return Response(b'', status=304, headers=headers)
+    if encoding:
+        headers['Content-Encoding'] = encoding
+        return Response(variants[encoding], mimetype='text/html', headers=headers)
+    return Response(body, mimetype='text/html', headers=headers)
+
+# The admin and index pages (inline CSS and JS included) are compressed once at startup
+ADMIN_VARIANTS = precompress(ADMIN_BYTES)
+ADMIN_ETAG = body_etag(ADMIN_BYTES)
+
+# Every index input (feature flags, default test email) is fixed at startup,
+# so the page is rendered a single time rather than per request
+INDEX_BYTES = None
+INDEX_VARIANTS = {}
+INDEX_ETAG = None
+
+@app.before_serving
+async def render_index():
+    """Render and compress the index page once; Quart's Jinja environment is
+    async, so this runs inside the serving loop rather than at import"""
+    global INDEX_BYTES, INDEX_VARIANTS, INDEX_ETAG
+    html = await render_template(INDEX_TEMPLATE, config=CONFIG_INFO, default_email=get_user_email())
+    INDEX_BYTES = html.encode('utf-8')
+    INDEX_VARIANTS = precompress(INDEX_BYTES)
+    INDEX_ETAG = body_etag(INDEX_BYTES)
+
+# Dynamic responses are gzipped on the way out when large enough to be worth it
+COMPRESS_MIMETYPES = {'text/html', 'application/json', 'text/css', 'application/javascript'}
+COMPRESS_MIN_SIZE = 500
+
+@app.after_request
+async def compress_response(response):
+    """Gzip HTML/JSON bodies for clients that accept it"""
+    if (response.mimetype not in COMPRESS_MIMETYPES
+            or 'Content-Encoding' in response.headers
+            or 'gzip' not in request.headers.get('Accept-Encoding', '')):
+        return response
+    body = await response.get_data()
+    if len(body) < COMPRESS_MIN_SIZE:
+        return response
+    response.set_data(gzip.compress(body, 6))
+    response.headers['Content-Encoding'] = 'gzip'
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(encoded_etag(etag, 'gzip'), weak)
+    response.vary.add('Accept-Encoding')
+    return response
+
+# When set, the admin page and its .gz copy are written here at startup so a
+# front proxy can serve /admin from disk with sendfile (see nginx.conf)
+STATIC_EXPORT_DIR = os.getenv("STATIC_EXPORT_DIR", "")
+
+@app.before_serving
+async def export_static_pages():
+    """Atomically write the pre-rendered admin page for the front proxy"""
+    if not STATIC_EXPORT_DIR:
+        return
+    try:
+        os.makedirs(STATIC_EXPORT_DIR, exist_ok=True)
+        for name, body in (('admin.html', ADMIN_BYTES), ('admin.html.gz', ADMIN_VARIANTS['gzip'])):
+            path = os.path.join(STATIC_EXPORT_DIR, name)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(body)
+            os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Could not export static pages: {e}")
+
 @app.route('/')
-def index():
+async def index():
     """Main page"""
-    config_info = {
-        'USE_GEMINI': USE_GEMINI,
-        'USE_AI_EVALUATION': USE_AI_EVALUATION,
-        'USE_AI_RESPONSES': USE_AI_RESPONSES,
-        'USE_AI_PROMPTS': USE_AI_PROMPTS
-    }
-    default_email = get_user_email()
-    return render_template_string(HTML_TEMPLATE, config=config_info, default_email=default_email)
+    # Private: the page carries the configured test user's email
+    return static_page(INDEX_BYTES, INDEX_VARIANTS, INDEX_ETAG, 'private, max-age=60')
 
 @app.route('/evaluate_story', methods=['POST'])
-def evaluate_story():
+async def evaluate_story():
     """Evaluate a pizza story"""
-    data = request.json
+    data = await get_request_json()
     story = data.get('story', '')
     
     try:
         if USE_AI_EVALUATION and USE_GEMINI:
             # Try Gemini evaluation
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            rating, explanation = loop.run_until_complete(gemini_evaluate_story(story))
+            rating, explanation = await gemini_evaluate_story(story)
             method = "Gemini AI"
         else:
             # Fallback to rule-based
@@ -1232,17 +1518,15 @@ def evaluate_story():
         })
 
 @app.route('/generate_coupon', methods=['POST'])
-def generate_coupon():
+async def generate_coupon():
     """Generate a complete coupon response"""
-    data = request.json
+    data = await get_request_json()
     story = data.get('story', '')
     
     try:
         # Evaluate story
         if USE_AI_EVALUATION and USE_GEMINI:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            rating, explanation = loop.run_until_complete(gemini_evaluate_story(story))
+            rating, explanation = await gemini_evaluate_story(story)
         else:
             rating = evaluate_story_quality(story)
             explanation = "Rule-based evaluation"
@@ -1252,11 +1536,7 @@ def generate_coupon():
         
         # Generate response
         if USE_AI_RESPONSES and USE_GEMINI:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            response = loop.run_until_complete(
-                gemini_generate_response_message(story, rating, tier, coupon_code)
-            )
+            response = await gemini_generate_response_message(story, rating, tier, coupon_code)
         else:
             # Fallback response
             if rating >= 8:
@@ -1281,17 +1561,14 @@ def generate_coupon():
         })
 
 @app.route('/generate_prompt')
-def generate_prompt():
+async def generate_prompt():
     """Generate a dynamic prompt"""
     try:
         if USE_AI_PROMPTS and USE_GEMINI:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            prompt = loop.run_until_complete(gemini_generate_unique_prompt())
+            prompt = await gemini_generate_unique_prompt()
             method = "Gemini AI"
         else:
             # Fallback prompt
-            import random
             fallback_prompts = [
                 "🍕💻 Hey TamuHacks 12.0 hacker! Your code is compiling, time for a pizza break! ✨\n\nTell me YOUR pizza story!",
                 "🧙‍♂️🍕 Greetings, TamuHacks 12.0 code wizard! The Pizza Genie has materialized! ✨\n\nShare YOUR greatest pizza tale!",
@@ -1311,9 +1588,9 @@ def generate_prompt():
         })
 
 @app.route('/send_coupon_email', methods=['POST'])
-def send_coupon_email_route():
+async def send_coupon_email_route():
     """Send coupon via email"""
-    data = request.json
+    data = await get_request_json()
     email = data.get('email', '').strip()
     coupon_code = data.get('coupon_code', '')
     tier = data.get('tier', '')
@@ -1330,19 +1607,30 @@ def send_coupon_email_route():
         return jsonify({"success": False, "message": "Coupon code is required"})
     
     # Send the email
-    result = send_coupon_email(email, coupon_code, tier, rating, personalized_message)
+    result = await asyncio.to_thread(
+        send_coupon_email, email, coupon_code, tier, rating, personalized_message
+    )
     return jsonify(result)
 
 @app.route('/check_email_config')
-def check_email_config():
+async def check_email_config():
     """Check if email is configured"""
-    result = test_email_configuration()
-    return jsonify(result)
+    result = await asyncio.to_thread(get_email_configuration_status)
+    body = orjson.dumps(result)
+    etag = body_etag(body)
+    headers = {'Cache-Control': 'private, max-age=30', 'ETag': f'"{etag}"'}
+    # The client may hold the gzipped copy, which compress_response tags
+    # with the suffixed ETag; either one means the body is unchanged
+    for cached_etag in (etag, encoded_etag(etag, 'gzip')):
+        if request.if_none_match.contains(cached_etag):
+            headers['ETag'] = f'"{cached_etag}"'
+            return Response(b'', status=304, headers=headers)
+    return Response(body, mimetype='application/json', headers=headers)
 
 @app.route('/generate_coupon_with_email', methods=['POST'])
-def generate_coupon_with_email():
+async def generate_coupon_with_email():
     """Generate a complete coupon response and send via email"""
-    data = request.json
+    data = await get_request_json()
     story = data.get('story', '')
     email = data.get('email', '').strip()
     
@@ -1355,9 +1643,7 @@ def generate_coupon_with_email():
     try:
         # Evaluate story
         if USE_AI_EVALUATION and USE_GEMINI:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            rating, explanation = loop.run_until_complete(gemini_evaluate_story(story))
+            rating, explanation = await gemini_evaluate_story(story)
         else:
             rating = evaluate_story_quality(story)
             explanation = "Rule-based evaluation"
@@ -1367,11 +1653,7 @@ def generate_coupon_with_email():
         
         # Generate response
         if USE_AI_RESPONSES and USE_GEMINI:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            response = loop.run_until_complete(
-                gemini_generate_response_message(story, rating, tier, coupon_code)
-            )
+            response = await gemini_generate_response_message(story, rating, tier, coupon_code)
         else:
             # Fallback response
             if rating >= 8:
@@ -1382,7 +1664,9 @@ def generate_coupon_with_email():
                 response = f"🍕 Thanks for sharing! Your coupon: **{coupon_code}** - Gets you a tasty pizza! 🙂"
         
         # Send email
-        email_result = send_coupon_email(email, coupon_code, tier, rating, response)
+        email_result = await asyncio.to_thread(
+            send_coupon_email, email, coupon_code, tier, rating, response
+        )
         
         return jsonify({
             'coupon_code': coupon_code,
@@ -1404,14 +1688,19 @@ def generate_coupon_with_email():
         })
 
 @app.route('/admin')
-def admin_dashboard():
+async def admin_dashboard():
     """Admin dashboard page"""
-    return render_template_string(ADMIN_TEMPLATE)
+    return static_page(ADMIN_BYTES, ADMIN_VARIANTS, ADMIN_ETAG)
+
+def load_event_summary() -> dict:
+    """Read the analytics file and build the event summary"""
+    analytics = PizzaAgentAnalytics("pizza_agent_analytics.json")
+    return analytics.generate_event_summary()
 
 @app.route('/admin_summary', methods=['POST'])
-def admin_summary():
+async def admin_summary():
     """Generate admin summary of all reviews (with simple admin validation)"""
-    data = request.json
+    data = await get_request_json()
     admin_confirmation = data.get('admin_confirmed', False)
     
     if not admin_confirmation:
@@ -1421,10 +1710,9 @@ def admin_summary():
         }), 403
     
     try:
-        # Load analytics and generate summary
-        from utils import PizzaAgentAnalytics
-        analytics = PizzaAgentAnalytics("pizza_agent_analytics.json")
-        summary_data = analytics.generate_event_summary()
+        # Load analytics and generate summary; file read and aggregation run
+        # in a worker thread so other requests keep being served meanwhile
+        summary_data = await asyncio.to_thread(load_event_summary)
         
         return jsonify({
             'success': True,
@@ -1435,58 +1723,97 @@ def admin_summary():
             'error': f'Failed to generate summary: {str(e)}'
         }), 500
 
-@app.route('/test_workflow')
-def test_workflow():
-    """Test the complete pizza agent workflow"""
-    test_story = "I had the most amazing pizza during my last hackathon! I was coding until 3am and getting really tired. Then my teammate ordered this incredible pepperoni pizza with extra cheese. The moment I took a bite, I got a burst of energy and solved the bug I'd been working on for hours! That pizza literally saved our project and we ended up winning second place. Best pizza ever! 🍕"
+@app.route('/admin_summary_html', methods=['POST'])
+async def admin_summary_html():
+    """Admin summary as a ready-to-insert HTML fragment for the dashboard"""
+    data = await get_request_json()
     
-    steps = []
+    if not data.get('admin_confirmed', False):
+        html = await render_template(
+            ADMIN_RESULT_TEMPLATE,
+            error_title='Access Denied',
+            error='Please confirm you are an admin to access this feature'
+        )
+        return Response(html, status=403, mimetype='text/html')
     
     try:
-        # Step 1: Generate prompt
+        summary_data = await asyncio.to_thread(load_event_summary)
+        html = await render_template(
+            ADMIN_RESULT_TEMPLATE,
+            summary=summary_data,
+            theme_labels=THEME_CARD_LABELS,
+            generated_at=datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        )
+        return Response(html, mimetype='text/html')
+    except Exception as e:
+        html = await render_template(
+            ADMIN_RESULT_TEMPLATE,
+            error_title='System Error',
+            error=f'Failed to generate analysis: {str(e)}'
+        )
+        return Response(html, status=500, mimetype='text/html')
+
+def sse_event(data, event: str = None) -> bytes:
+    """One Server-Sent Events message with a JSON payload"""
+    prefix = f"event: {event}\n" if event else ""
+    return prefix.encode('utf-8') + b"data: " + orjson.dumps(data) + b"\n\n"
+
+@app.route('/test_workflow')
+async def test_workflow():
+    """Test the complete pizza agent workflow, streaming each step as it completes"""
+    test_story = "I had the most amazing pizza during my last hackathon! I was coding until 3am and getting really tired. Then my teammate ordered this incredible pepperoni pizza with extra cheese. The moment I took a bite, I got a burst of energy and solved the bug I'd been working on for hours! That pizza literally saved our project and we ended up winning second place. Best pizza ever! 🍕"
+    
+    async def prompt_step():
         if USE_AI_PROMPTS and USE_GEMINI:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            prompt = loop.run_until_complete(gemini_generate_unique_prompt())
-            steps.append({"name": "Generate Prompt (Gemini)", "result": prompt[:200] + "..."})
-        else:
-            steps.append({"name": "Generate Prompt (Fallback)", "result": "Using static prompt template"})
-        
-        # Step 2: Evaluate story
+            prompt = await gemini_generate_unique_prompt()
+            return {"name": "Generate Prompt (Gemini)", "result": prompt[:200] + "..."}
+        return {"name": "Generate Prompt (Fallback)", "result": "Using static prompt template"}
+    
+    async def evaluate_step():
         if USE_AI_EVALUATION and USE_GEMINI:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            rating, explanation = loop.run_until_complete(gemini_evaluate_story(test_story))
-            steps.append({"name": "Evaluate Story (Gemini)", "result": f"Rating: {rating}/10 - {explanation}"})
-        else:
-            rating = evaluate_story_quality(test_story)
-            steps.append({"name": "Evaluate Story (Fallback)", "result": f"Rating: {rating}/10 - Rule-based evaluation"})
-        
-        # Step 3: Generate coupon
-        coupon_code, tier = generate_coupon_code("test_user", rating, True)
-        steps.append({"name": "Generate Coupon", "result": f"Code: {coupon_code}, Tier: {tier}"})
-        
-        # Step 4: Generate response
-        if USE_AI_RESPONSES and USE_GEMINI:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            response = loop.run_until_complete(
-                gemini_generate_response_message(test_story, rating, tier, coupon_code)
-            )
-            steps.append({"name": "Generate Response (Gemini)", "result": response})
-        else:
-            response = f"Great story! Your coupon: {coupon_code} - Gets you a {tier} pizza!"
-            steps.append({"name": "Generate Response (Fallback)", "result": response})
-        
-        return jsonify({"steps": steps})
-        
-    except Exception as e:
-        steps.append({"name": "Error", "result": f"Workflow failed: {str(e)}"})
-        return jsonify({"steps": steps})
+            rating, explanation = await gemini_evaluate_story(test_story)
+            return rating, {"name": "Evaluate Story (Gemini)", "result": f"Rating: {rating}/10 - {explanation}"}
+        rating = evaluate_story_quality(test_story)
+        return rating, {"name": "Evaluate Story (Fallback)", "result": f"Rating: {rating}/10 - Rule-based evaluation"}
+    
+    async def events():
+        # Steps 1 and 2: the prompt and the story evaluation are independent,
+        # so both Gemini calls are in flight at the same time
+        prompt_task = asyncio.create_task(prompt_step())
+        evaluate_task = asyncio.create_task(evaluate_step())
+        try:
+            yield sse_event(await prompt_task)
+            rating, evaluation_result = await evaluate_task
+            yield sse_event(evaluation_result)
+            
+            # Step 3: Generate coupon
+            coupon_code, tier = generate_coupon_code("test_user", rating, True)
+            yield sse_event({"name": "Generate Coupon", "result": f"Code: {coupon_code}, Tier: {tier}"})
+            
+            # Step 4: Generate response
+            if USE_AI_RESPONSES and USE_GEMINI:
+                response = await gemini_generate_response_message(test_story, rating, tier, coupon_code)
+                yield sse_event({"name": "Generate Response (Gemini)", "result": response})
+            else:
+                response = f"Great story! Your coupon: {coupon_code} - Gets you a {tier} pizza!"
+                yield sse_event({"name": "Generate Response (Fallback)", "result": response})
+        except Exception as e:
+            yield sse_event({"name": "Error", "result": f"Workflow failed: {str(e)}"})
+        finally:
+            prompt_task.cancel()
+            evaluate_task.cancel()
+        # Tells the browser to close the stream instead of reconnecting
+        yield sse_event({}, event='done')
+    
+    return Response(events(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
 
 if __name__ == '__main__':
     print("🍕 Starting Pizza Agent Web Test Interface")
     print("📱 Open your browser to: http://127.0.0.1:5001")
     print("🔧 This interface tests the pizza agent functionality directly")
+    print("🚀 Production: BIND=127.0.0.1:5001 gunicorn -c gunicorn_conf.py web_test_interface:app")
     print()
     app.run(debug=True, host='127.0.0.1', port=5001)
\ No newline at end of file